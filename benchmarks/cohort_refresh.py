@@ -0,0 +1,92 @@
+"""Clinic refresh benchmark for the cohort analytics.
+
+Seeds a patient-keyed dose log (10k patients x 6 months by default, kept
+between runs with ``--db``), then times the Clinic page's summary tables:
+
+* a cold refresh that summarizes every partition,
+* a warm call answered from the cached tables,
+* the refresh after logging one dose, which re-reads a single partition.
+
+Usage::
+
+    python benchmarks/cohort_refresh.py
+    python benchmarks/cohort_refresh.py --patients 2000 --workers 4
+    python benchmarks/cohort_refresh.py --db /tmp/cohort.sqlite3   # reuse the seeded log
+
+Exits non-zero when the refresh after a new dose exceeds the budget.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Seconds allowed for the refresh after a single new dose
+BUDGET_S = 0.5
+MEDICATIONS = ['Isoniazid (INH)', 'Rifampin (RIF)', 'Pyrazinamide (PZA)', 'Ethambutol (EMB)']
+
+
+def _seed(store, patients, days):
+    from medtracker.datagen import dose_records, generate_doses
+
+    # Chunked so the generated frame and row tuples stay small
+    chunk = 1000
+    for first in range(0, patients, chunk):
+        doses = generate_doses(MEDICATIONS, days=days, patients=min(chunk, patients - first), seed=first,
+                               end=date.today() - timedelta(days=1))
+        doses['patient_id'] += first
+        store.append_many(dose_records(doses))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--patients', type=int, default=10_000)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--workers', type=int, help='summary processes (default: one per CPU)')
+    parser.add_argument('--db', help='cohort log to reuse or create (default: a temporary file)')
+    parser.add_argument('--budget', type=float, default=BUDGET_S)
+    args = parser.parse_args()
+
+    from medtracker.cohort import CohortAnalytics
+    from medtracker.store import DoseStore
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix='medtracker-cohort-'), 'cohort.sqlite3')
+    store = DoseStore(path)
+    if len(store) == 0:
+        started = time.perf_counter()
+        _seed(store, args.patients, args.days)
+        print(f"seeded {len(store):,} doses in {time.perf_counter() - started:.1f} s")
+
+    cohort = CohortAnalytics(store, workers=args.workers)
+    today = date.today()
+    try:
+        started = time.perf_counter()
+        patients = cohort.summary(today)['patients']
+        cold_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        cohort.summary(today)
+        warm_s = time.perf_counter() - started
+
+        store.append_dose(MEDICATIONS[0], today, 'Taken', patient_id=int(patients.index[len(patients) // 2]))
+        started = time.perf_counter()
+        cohort.summary(today)
+        incremental_s = time.perf_counter() - started
+    finally:
+        cohort.close()
+        store.close()
+
+    print(f"{len(patients):,} patients, {cohort.workers} worker(s)")
+    print(f"  cold refresh      {cold_s * 1000:8.0f} ms")
+    print(f"  cached            {warm_s * 1000:8.1f} ms")
+    print(f"  after one dose    {incremental_s * 1000:8.0f} ms (budget {args.budget * 1000:.0f} ms)")
+    if incremental_s > args.budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Concurrent dose logging benchmark for the write-behind queue.
+
+Simulates ``--sessions`` sessions each logging ``--doses`` doses as fast as
+they can, first with every submit appending synchronously to the store and
+then through the ``DoseWriter``. In the queued run each session waits for its
+previous dose before logging the next, as a rerun reading its own writes
+would; that wait is not part of the submit latency. Prints sustained
+throughput and submit latency for both:
+
+    python benchmarks/dose_writes.py
+    python benchmarks/dose_writes.py --sessions 64 --doses 100
+
+Exits non-zero when queued submits are slower at p95 than synchronous ones.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _session(log, doses, latencies, read):
+    for n in range(doses):
+        read()
+        started = time.perf_counter()
+        log('Isoniazid (INH)', date.today(), 'Taken', f'dose {n}')
+        latencies.append(time.perf_counter() - started)
+
+
+def _run(log, sessions, doses, read=lambda: None):
+    latencies = []
+    threads = [threading.Thread(target=_session, args=(log, doses, latencies, read)) for _ in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return sessions * doses / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=32)
+    parser.add_argument('--doses', type=int, default=50)
+    args = parser.parse_args()
+
+    from medtracker.store import DoseStore
+    from medtracker.writer import DoseWriter
+
+    directory = tempfile.mkdtemp(prefix='medtracker-writes-')
+    store = DoseStore(os.path.join(directory, 'direct.sqlite3'))
+    direct = _run(store.append_dose, args.sessions, args.doses)
+    store.close()
+
+    store = DoseStore(os.path.join(directory, 'queued.sqlite3'))
+    writer = DoseWriter(store)
+    local = threading.local()
+
+    def queued(*dose):
+        local.ticket = writer.append_dose(*dose)
+
+    def read_own_writes():
+        # The session's next rerun reads its own previous dose first
+        if getattr(local, 'ticket', None):
+            writer.wait(local.ticket)
+
+    queued_stats = _run(queued, args.sessions, args.doses, read_own_writes)
+    writer.close()
+    assert len(store) == args.sessions * args.doses
+    store.close()
+
+    print(f"{args.sessions} sessions x {args.doses} doses")
+    for label, (throughput, p50, p95) in (('synchronous', direct), ('write-behind', queued_stats)):
+        print(f"  {label:<13} {throughput:8.0f} doses/s   submit p50 {p50 * 1000:6.2f} ms   p95 {p95 * 1000:6.2f} ms")
+    if queued_stats[2] > direct[2]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Import-time budget for the app's cold start.
+
+In a fresh interpreter, Streamlit and pandas are imported first (every worker
+pays for them regardless; Streamlit only stopped importing pandas itself in
+1.33), then the top-level imports of ``app.py`` are timed. The
+check fails when they take longer than the budget or when they pull in a
+module that only a single page needs. Each page module's own import cost is
+reported as well.
+
+Usage::
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --budget 0.3 --repeat 5
+
+Exits non-zero when the budget is exceeded. ``tests/test_import_budget.py``
+runs the same check under pytest.
+"""
+import argparse
+import ast
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds allowed for app.py's top-level imports, on top of Streamlit's own
+BUDGET_S = 0.3
+# Modules that only individual pages may import
+DEFERRED = ('plotly', 'matplotlib', 'streamlit_calendar', 'streamlit_card')
+
+
+def _app_imports():
+    """Source of every top-level import statement in app.py."""
+    with open(os.path.join(ROOT, 'app.py')) as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def _worker():
+    """Time app.py's imports and then each page module in this interpreter."""
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    # The framework baseline is not counted
+    import pandas  # noqa: F401
+    import streamlit  # noqa: F401
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    before = set(sys.modules)
+    started = time.perf_counter()
+    for statement in _app_imports():
+        exec(statement, {})
+    app_s = time.perf_counter() - started
+    loaded = set(sys.modules) - before
+    result = {
+        'app_s': app_s,
+        'modules': len(loaded),
+        'deferred_loaded': sorted({name.split('.')[0] for name in loaded} & set(DEFERRED)),
+        # ru_maxrss is reported in KiB on Linux
+        'rss_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024,
+        'pages': {},
+    }
+
+    from medtracker.views import PAGES
+    for page, module in PAGES.items():
+        started = time.perf_counter()
+        __import__(f'medtracker.views.{module}')
+        result['pages'][page] = time.perf_counter() - started
+    return result
+
+
+def measure(repeat):
+    """``_worker`` results from ``repeat`` fresh interpreters."""
+    runs = []
+    for _ in range(repeat):
+        worker = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker'],
+                                capture_output=True, text=True)
+        if worker.returncode:
+            raise RuntimeError(f'Import worker failed:\n{worker.stderr}')
+        runs.append(json.loads(worker.stdout.strip().splitlines()[-1]))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=float, default=BUDGET_S, help='seconds allowed for app.py imports')
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters to take the median of')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(_worker(), sys.stdout)
+        return
+
+    try:
+        runs = measure(args.repeat)
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
+
+    app_s = statistics.median(run['app_s'] for run in runs)
+    print(f"app.py imports: {app_s * 1000:.0f} ms, {runs[0]['modules']} modules, "
+          f"+{runs[0]['rss_mb']:.0f} MB (budget {args.budget * 1000:.0f} ms)")
+    for page in runs[0]['pages']:
+        page_s = statistics.median(run['pages'][page] for run in runs)
+        print(f"  {page:<14} +{page_s * 1000:5.0f} ms on first visit")
+
+    failures = []
+    if app_s > args.budget:
+        failures.append(f'app.py imports took {app_s * 1000:.0f} ms')
+    if runs[0]['deferred_loaded']:
+        failures.append(f"app.py imports page-only modules: {', '.join(runs[0]['deferred_loaded'])}")
+    if failures:
+        raise SystemExit('Import budget exceeded: ' + '; '.join(failures))
+
+
+if __name__ == '__main__':
+    main()
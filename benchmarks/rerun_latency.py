@@ -0,0 +1,184 @@
+"""Rerun-latency benchmark for every page of the app.
+
+Each data size runs in a fresh worker process so cold start and peak RSS are
+measured cleanly. A worker seeds a temporary dose store and reminder index
+with the requested number of rows, then drives each sidebar page through
+Streamlit's ``AppTest``. It records the first run, repeated reruns, the
+serialized ForwardMsg payload and the process's peak RSS.
+
+Usage::
+
+    python benchmarks/rerun_latency.py                      # 1k, 100k and 1M rows
+    python benchmarks/rerun_latency.py --sizes 1000 --reruns 3
+    python benchmarks/rerun_latency.py --compare benchmarks/results/abc1234.json
+
+Results are written to ``benchmarks/results/<commit>.json``.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+PAGES = ["Dashboard", "Analytics", "Personal Info", "Medications", "Schedule", "Drone Service", "Clinic"]
+SIZES = [1_000, 100_000, 1_000_000]
+MEDICATIONS = ['Isoniazid (INH)', 'Rifampin (RIF)', 'Pyrazinamide (PZA)', 'Ethambutol (EMB)']
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _seed(rows, data_dir):
+    """Fill a fresh dose store and reminder index with ``rows`` entries each."""
+    from medtracker.datagen import dose_records, generate_doses
+    from medtracker.reminders import ReminderIndex
+    from medtracker.store import DoseStore
+
+    days = 180
+    patients = -(-rows // (days * len(MEDICATIONS)))
+    doses = generate_doses(MEDICATIONS, days=days, patients=patients,
+                           end=datetime.now().date() - timedelta(days=1)).head(rows)
+    store = DoseStore(os.path.join(data_dir, 'doses.sqlite3'))
+    store.append_many(dose_records(doses))
+    store.close()
+
+    # One-off reminders spread over the year around today
+    reminders = ReminderIndex()
+    start = datetime.now() - timedelta(days=182)
+    step = timedelta(days=365) / rows
+    for i in range(rows):
+        reminders.add(MEDICATIONS[i % len(MEDICATIONS)], start + step * i, 'Benchmark reminder')
+    return reminders
+
+
+def _worker(rows, reruns):
+    """Benchmark every page at one data size; returns a JSON-able dict."""
+    data_dir = tempfile.mkdtemp(prefix='medtracker-bench-')
+    os.environ['MEDTRACKER_DATA_DIR'] = data_dir
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    started = time.perf_counter()
+    reminders = _seed(rows, data_dir)
+    seed_s = time.perf_counter() - started
+
+    import streamlit_option_menu
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    # Record the size of the messages each run sends to the browser
+    payload = {}
+    parse_tree = local_script_runner.parse_tree_from_messages
+
+    def measuring_parse(messages):
+        payload['bytes'] = sum(message.ByteSize() for message in messages)
+        return parse_tree(messages)
+
+    local_script_runner.parse_tree_from_messages = measuring_parse
+
+    result = {'rows': rows, 'seed_s': seed_s, 'pages': {}}
+    for page in PAGES:
+        streamlit_option_menu.option_menu = lambda *args, _page=page, **kwargs: _page
+        app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=900)
+        app.session_state['reminders'] = reminders
+
+        started = time.perf_counter()
+        app.run()
+        first_run = time.perf_counter() - started
+        result.setdefault('cold_start_s', first_run)
+        if app.exception:
+            raise RuntimeError(f'{page} raised: {app.exception[0].value}')
+
+        timings = []
+        for _ in range(reruns):
+            started = time.perf_counter()
+            app.run()
+            timings.append(time.perf_counter() - started)
+
+        result['pages'][page] = {
+            'first_run_s': first_run,
+            'rerun_s': {
+                'mean': statistics.fmean(timings),
+                'median': statistics.median(timings),
+                'max': max(timings),
+            },
+            'payload_bytes': payload.get('bytes', 0),
+            # ru_maxrss is reported in KiB on Linux
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    return result
+
+
+def _compare(current, baseline):
+    """Print per-page rerun and payload ratios against a baseline result file."""
+    for size, run in current['sizes'].items():
+        base_run = baseline['sizes'].get(size)
+        if not base_run:
+            continue
+        print(f"\n{int(size):,} rows (vs {baseline['commit']})")
+        for page, stats in run['pages'].items():
+            base = base_run['pages'].get(page)
+            if not base:
+                continue
+            rerun = stats['rerun_s']['median'] / base['rerun_s']['median']
+            size_ratio = stats['payload_bytes'] / max(base['payload_bytes'], 1)
+            print(f"  {page:<14} rerun x{rerun:5.2f}   payload x{size_ratio:5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='rows of dose log and reminders')
+    parser.add_argument('--reruns', type=int, default=5, help='reruns timed per page')
+    parser.add_argument('--output', help='result file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='earlier result file to compare against')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(_worker(args.worker, args.reruns), sys.stdout)
+        return
+
+    commit = _commit()
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': {},
+    }
+    for rows in args.sizes:
+        print(f'Benchmarking {rows:,} rows...', file=sys.stderr)
+        worker = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', str(rows), '--reruns', str(args.reruns)],
+            capture_output=True, text=True)
+        if worker.returncode:
+            sys.stderr.write(worker.stderr)
+            raise SystemExit(f'Benchmark worker failed at {rows:,} rows')
+        results['sizes'][str(rows)] = json.loads(worker.stdout.strip().splitlines()[-1])
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Wrote {output}', file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            _compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
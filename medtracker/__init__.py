@@ -0,0 +1,5 @@
+"""Storage and analytics engines behind the TB MedTracker Streamlit app."""
+import os
+
+# Where the dose log and exported metrics live
+DATA_DIR = os.environ.get('MEDTRACKER_DATA_DIR', 'data')
@@ -0,0 +1,101 @@
+"""Versioned DataFrame materialization for the Analytics page.
+
+The typed frame and every per-period aggregate are built once per dose-log
+version and reused across reruns until the store records a new dose.
+"""
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+from medtracker import perf
+from medtracker.records import STATUSES, DoseRecords
+
+# Period label -> number of days shown, in display order
+PERIODS = {
+    'Last 7 Days': 7,
+    'Last 30 Days': 30,
+    'Last 6 Months': 180,
+}
+
+
+def typed_frame(doses):
+    """Build a compact frame from ``DoseRecords`` or dose dicts.
+
+    ``date`` becomes datetime64, ``medication``/``status`` categoricals and
+    ``hour`` the int8 local hour each dose was taken (-1 when unknown).
+    """
+    if not isinstance(doses, DoseRecords):
+        doses = DoseRecords(doses)
+    return doses.to_frame()
+
+
+def _aggregate(counts, hourly, cutoff):
+    """Slice the once-grouped counts down to the days after ``cutoff``."""
+    window = counts[counts.index.get_level_values('date') > cutoff]
+
+    daily = window.groupby(level=['date', 'status'], observed=True).sum().unstack(fill_value=0)
+    daily = daily.reindex(columns=list(STATUSES), fill_value=0)
+    daily.columns = list(daily.columns)
+    if not daily.empty:
+        daily['adherence_rate'] = daily['Taken'] / daily[list(STATUSES)].sum(axis=1) * 100
+
+    by_medication = window.groupby(level=['medication', 'status'], observed=True).sum().unstack(fill_value=0)
+    by_medication = by_medication.reindex(columns=list(STATUSES), fill_value=0)
+    by_medication.columns = list(by_medication.columns)
+    by_medication = by_medication[by_medication.sum(axis=1) > 0]
+    if not by_medication.empty:
+        by_medication = by_medication.div(by_medication.sum(axis=1), axis=0) * 100
+
+    hourly_window = None
+    if hourly is not None:
+        hourly_window = hourly[hourly.index.get_level_values('date') > cutoff]
+        hourly_window = hourly_window.groupby(level='hour').sum()
+        hourly_window = hourly_window[hourly_window > 0]
+
+    return {'daily': daily, 'hourly': hourly_window, 'by_medication': by_medication}
+
+
+class AnalyticsCache:
+    """Typed dose frame plus per-period aggregates, keyed on the log version."""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._key = None
+        self.frame = None
+        self._aggregates = {}
+
+    def _refresh(self, today):
+        key = (self.store.version, today)
+        if key == self._key:
+            return
+        start = today - timedelta(days=max(PERIODS.values()) - 1)
+        frame = typed_frame(self.store.scan((start, None)))
+
+        # Group once; every period is then a slice of these counts
+        with perf.span('analytics.groupby'):
+            counts = frame.groupby(['date', 'medication', 'status'], observed=True).size()
+            hourly = None
+            taken = frame[(frame['status'] == 'Taken') & (frame['hour'] >= 0)]
+            if not taken.empty:
+                hourly = taken.groupby(['date', 'hour'], observed=True).size()
+
+        aggregates = {}
+        for label, days in PERIODS.items():
+            cutoff = pd.Timestamp(today - timedelta(days=days))
+            with perf.span('analytics.aggregate'):
+                aggregates[label] = _aggregate(counts, hourly, cutoff)
+
+        self.frame = frame
+        self._aggregates = aggregates
+        self._key = key
+
+    def aggregates(self, period, today=None):
+        """Return ``{'daily', 'hourly', 'by_medication'}`` for a period label.
+
+        ``hourly`` is ``None`` when no taken dose was logged with a time.
+        """
+        with self._lock:
+            self._refresh(today or date.today())
+            return self._aggregates[period]
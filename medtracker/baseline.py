@@ -0,0 +1,154 @@
+"""Shared read-only sample data with per-session copy-on-write overlays.
+
+Every new session starts from the same sample medications, profile and
+schedule. ``Baseline`` holds that data once per process, frozen, and sessions
+layer their own edits on top: ``MedicationList`` only copies its (shared)
+entries and name index the first time the session changes them, the profile
+is a ``ChainMap`` whose writes land in the session's own dict, and a
+``Schedule`` created with ``base=`` keeps only the rules the session added or
+removed.
+"""
+from collections import ChainMap
+from collections.abc import MutableSequence
+from types import MappingProxyType
+
+from medtracker.calendar_feed import EventFeed
+from medtracker.catalog import SearchIndex
+from medtracker.reminders import ReminderIndex
+from medtracker.schedule import REGIMEN_DAYS, DoseRule, Schedule
+
+
+class Baseline:
+    """Immutable sample data for sessions started on ``day``."""
+
+    def __init__(self, medications, personal_info, day):
+        self.day = day
+        self.medications = tuple(MappingProxyType(dict(med)) for med in medications)
+        self.medication_ids = tuple(range(1, len(self.medications) + 1))
+        self.medication_index = SearchIndex(zip(self.medication_ids, (med['name'] for med in self.medications)))
+        self.personal_info = MappingProxyType(dict(personal_info))
+        # Each medication follows a 6-month regimen starting on ``day``
+        self.schedule = Schedule(ReminderIndex())
+        for med in self.medications:
+            self.schedule.set_rule(DoseRule.for_medication(med, day, days=REGIMEN_DAYS))
+        # Calendar pages for sessions that haven't changed their schedule
+        self.event_feed = EventFeed(self.schedule)
+
+    def session_medications(self):
+        return MedicationList(self.medications, self.medication_ids, self.medication_index)
+
+    def session_personal_info(self):
+        return ChainMap({}, self.personal_info)
+
+    def session_schedule(self, reminders):
+        return Schedule(reminders, base=self.schedule)
+
+
+class MedicationList(MutableSequence):
+    """A session's medication list, sharing the baseline's until first edited.
+
+    Entries taken from the baseline are read-only mappings; replace an entry
+    (``meds[i] = {**meds[i], 'stock': 10}``) rather than mutating it. Every
+    entry also has a stable id, kept when the entry is replaced, for looking
+    it up, removing it and searching by name without knowing its position.
+    Entries are set and deleted one index at a time; slices raise
+    ``TypeError``.
+    """
+
+    def __init__(self, base=(), ids=None, index=None):
+        self._items = base
+        self._ids = tuple(ids) if ids is not None else tuple(range(1, len(base) + 1))
+        self._next_id = max(self._ids, default=0) + 1
+        self._index = index if index is not None else SearchIndex(zip(self._ids, (med['name'] for med in base)))
+        self._shared_index = index is not None
+        self._positions = None
+
+    def _own(self):
+        # Copy the references, never the medication dicts themselves
+        if isinstance(self._items, tuple):
+            self._items = list(self._items)
+            self._ids = list(self._ids)
+        return self._items
+
+    def _own_index(self):
+        if self._shared_index:
+            self._index = self._index.copy()
+            self._shared_index = False
+        return self._index
+
+    @property
+    def shared(self):
+        """True while the list is still the baseline's."""
+        return isinstance(self._items, tuple)
+
+    @property
+    def ids(self):
+        """Entry ids, in list order."""
+        return tuple(self._ids)
+
+    def position(self, med_id):
+        """Where the entry with ``med_id`` is in the list; ``KeyError`` if it isn't."""
+        if self._positions is None:
+            self._positions = {med_id: position for position, med_id in enumerate(self._ids)}
+        return self._positions[med_id]
+
+    def get(self, med_id, default=None):
+        """The entry with ``med_id``, or ``default``."""
+        try:
+            return self._items[self.position(med_id)]
+        except KeyError:
+            return default
+
+    def remove_id(self, med_id):
+        """Remove and return the entry with ``med_id``."""
+        position = self.position(med_id)
+        med = self._items[position]
+        del self[position]
+        return med
+
+    def search(self, query, limit=None):
+        """Ids of the entries whose name matches ``query``, best first; every id for a blank query."""
+        if not query.strip():
+            return list(self._ids[:limit])
+        return self._index.search(query, limit)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def _position(self, index):
+        if isinstance(index, slice):
+            raise TypeError('MedicationList entries are set and deleted one index at a time, not by slice')
+        return range(len(self))[index]
+
+    def __setitem__(self, index, med):
+        index = self._position(index)
+        old_name = self._items[index]['name']
+        self._own()[index] = med
+        if med['name'] != old_name:
+            names = self._own_index()
+            names.remove(self._ids[index])
+            names.add(self._ids[index], med['name'])
+
+    def __delitem__(self, index):
+        index = self._position(index)
+        self._own()
+        self._own_index().remove(self._ids[index])
+        del self._items[index]
+        del self._ids[index]
+        self._positions = None
+
+    def insert(self, index, med):
+        self._own().insert(index, med)
+        med_id, self._next_id = self._next_id, self._next_id + 1
+        self._ids.insert(index, med_id)
+        self._own_index().add(med_id, med['name'])
+        self._positions = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __repr__(self):
+        return f'MedicationList({list(self._items)!r})'
@@ -0,0 +1,101 @@
+"""Windowed event feed for the Schedule calendar.
+
+Only events inside the visible range (plus a buffer) are sent to the calendar
+component. Events are serialized in fixed-size pages that are cached per
+schedule version, so moving between neighbouring views reuses most pages.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+
+# View picker label -> FullCalendar view type
+VIEWS = {
+    'Month': 'dayGridMonth',
+    'Week': 'timeGridWeek',
+    'Day': 'timeGridDay',
+}
+
+EVENT_MINUTES = 30
+
+
+def visible_range(view, anchor):
+    """The ``[start, end)`` dates FullCalendar shows for ``view`` around ``anchor``."""
+    if view == 'dayGridMonth':
+        start = anchor.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    elif view == 'timeGridWeek':
+        # Weeks start on Sunday, FullCalendar's default
+        start = anchor - timedelta(days=(anchor.weekday() + 1) % 7)
+        end = start + timedelta(days=7)
+    else:
+        start, end = anchor, anchor + timedelta(days=1)
+    return start, end
+
+
+def shift_anchor(view, anchor, steps):
+    """Move ``anchor`` by whole views, as the calendar's prev/next buttons do."""
+    if view == 'dayGridMonth':
+        month = anchor.month - 1 + steps
+        return date(anchor.year + month // 12, month % 12 + 1, 1)
+    return anchor + timedelta(days=steps * (7 if view == 'timeGridWeek' else 1))
+
+
+def view_from_callback(state):
+    """Extract ``(view type, current start date)`` from a calendar callback value.
+
+    ``dateClick``, ``eventClick`` and ``select`` payloads carry the active view;
+    other callbacks return ``None``.
+    """
+    payload = (state or {}).get((state or {}).get('callback'), {})
+    view = payload.get('view') if isinstance(payload, dict) else None
+    if not view or view.get('type') not in VIEWS.values():
+        return None
+    current_start = datetime.fromisoformat(view['currentStart'].replace('Z', '+00:00')).astimezone()
+    return view['type'], current_start.date()
+
+
+class EventFeed:
+    """Serialized calendar events for a schedule, cached in day pages.
+
+    Safe to share between sessions that show the same schedule.
+    """
+
+    def __init__(self, schedule, page_days=7, buffer_days=7, max_pages=64):
+        self.schedule = schedule
+        self.page_days = page_days
+        self.buffer_days = buffer_days
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()
+
+    def _page(self, ordinal):
+        key = (self.schedule.version, ordinal)
+        events = self._pages.get(key)
+        if events is not None:
+            self._pages.move_to_end(key)
+            return events
+
+        start = datetime.combine(date.fromordinal(ordinal), time())
+        events = [
+            {
+                'title': item['medication'],
+                'start': item['datetime'].isoformat(),
+                'end': (item['datetime'] + timedelta(minutes=EVENT_MINUTES)).isoformat(),
+            }
+            for item in self.schedule.occurrences(start, start + timedelta(days=self.page_days))
+        ]
+        self._pages[key] = events
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return events
+
+    def events(self, start, end):
+        """Events from ``start - buffer`` up to ``end + buffer`` (dates, end exclusive)."""
+        lo = (start - timedelta(days=self.buffer_days)).toordinal()
+        hi = (end + timedelta(days=self.buffer_days)).toordinal()
+        first_page = lo - lo % self.page_days
+        events = []
+        with self._lock:
+            for ordinal in range(first_page, hi, self.page_days):
+                events.extend(self._page(ordinal))
+        return events
@@ -0,0 +1,110 @@
+"""Name search over a medication catalog.
+
+``SearchIndex`` maps stable ids to names and answers two kinds of query
+without scanning every name. Prefix matches come from a sorted list of
+``(word, id)`` pairs, so each query word is a bisect plus a walk over the
+words it prefixes. Fuzzy matches, for misspellings, come from postings of
+character trigrams, scored by the share of the query's trigrams a name
+contains. Adding or removing a name only touches that name's entries.
+"""
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+
+# Share of the query's trigrams a name must contain to be a fuzzy match
+FUZZY_MIN_SCORE = 0.5
+
+
+def _words(name):
+    return sorted(set(re.findall(r'[a-z0-9]+', name.lower())))
+
+
+def _trigrams(name):
+    grams = set()
+    for word in _words(name):
+        padded = f' {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """Prefix and fuzzy search over ``(id, name)`` pairs."""
+
+    def __init__(self, entries=()):
+        self._names = {}
+        self._words = []
+        self._grams = defaultdict(set)
+        for item_id, name in entries:
+            self._names[item_id] = name
+            self._words.extend((word, item_id) for word in _words(name))
+            for gram in _trigrams(name):
+                self._grams[gram].add(item_id)
+        self._words.sort()
+
+    def copy(self):
+        index = SearchIndex()
+        index._names = dict(self._names)
+        index._words = list(self._words)
+        index._grams = defaultdict(set, {gram: set(ids) for gram, ids in self._grams.items()})
+        return index
+
+    def add(self, item_id, name):
+        self._names[item_id] = name
+        for word in _words(name):
+            insort(self._words, (word, item_id))
+        for gram in _trigrams(name):
+            self._grams[gram].add(item_id)
+
+    def remove(self, item_id):
+        name = self._names.pop(item_id)
+        for word in _words(name):
+            del self._words[bisect_left(self._words, (word, item_id))]
+        for gram in _trigrams(name):
+            ids = self._grams[gram]
+            ids.discard(item_id)
+            if not ids:
+                del self._grams[gram]
+
+    def _prefixed(self, word):
+        """Ids with a word starting with ``word``."""
+        found = set()
+        for position in range(bisect_left(self._words, (word,)), len(self._words)):
+            indexed, item_id = self._words[position]
+            if not indexed.startswith(word):
+                break
+            found.add(item_id)
+        return found
+
+    def search(self, query, limit=None):
+        """Ids whose name matches ``query``, best first.
+
+        Names where every query word starts one of the name's words come
+        first, those starting with the whole query ahead of the rest, then
+        alphabetically. Misspelled names follow, by trigram overlap.
+        """
+        words = _words(query)
+        if not words:
+            return []
+        matches = set.intersection(*(self._prefixed(word) for word in words))
+        text = query.strip().lower()
+        ranked = sorted(matches, key=lambda item_id: (not self._names[item_id].lower().startswith(text),
+                                                      self._names[item_id].lower()))
+        if limit is not None and len(ranked) >= limit:
+            return ranked[:limit]
+
+        grams = _trigrams(query)
+        shared = Counter(item_id for gram in grams for item_id in self._grams.get(gram, ()))
+        scores = {item_id: overlap / len(grams) for item_id, overlap in shared.items() if item_id not in matches}
+        ranked.extend(sorted((item_id for item_id, score in scores.items() if score >= FUZZY_MIN_SCORE),
+                             key=lambda item_id: (-scores[item_id], self._names[item_id].lower())))
+        return ranked if limit is None else ranked[:limit]
+
+    def __len__(self):
+        return len(self._names)
+
+
+def paginate(items, page, page_size):
+    """``(items on page, page, page count)`` for the zero-based ``page``, clamped into range."""
+    page_count = max(-(-len(items) // page_size), 1)
+    page = min(max(page, 0), page_count - 1)
+    return items[page * page_size:(page + 1) * page_size], page, page_count
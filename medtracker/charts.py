@@ -0,0 +1,95 @@
+"""Bounded, cached Plotly figures for the chart-heavy pages.
+
+A figure is built once per key (the chart, the version of the data behind it
+and the period shown) and reused by every session and rerun until the data
+changes. Long series are downsampled with
+largest-triangle-three-buckets (LTTB) before plotting, so a trace never
+carries more than ``MAX_POINTS`` points however long the history grows.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from medtracker import perf
+
+# Points kept per time-series trace
+MAX_POINTS = 500
+
+
+def lttb(x, y, threshold=MAX_POINTS):
+    """Indices of the ``threshold`` points LTTB keeps from the series ``(x, y)``.
+
+    The first and last points are always kept. The rest are split into
+    ``threshold - 2`` buckets, and each bucket keeps the point forming the
+    largest triangle with the point kept before it and the next bucket's
+    average. Missing ``y`` values count as zero when choosing.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Each bucket's successor average: the next bucket, or the last point. The
+    # last bucket ends before the final point, so the sums stop there too
+    sums_x = np.add.reduceat(x[:edges[-1]], edges[:-1])
+    sums_y = np.add.reduceat(y[:edges[-1]], edges[:-1])
+    sizes = np.diff(edges)
+    next_x = np.r_[sums_x[1:] / sizes[1:], x[-1]]
+    next_y = np.r_[sums_y[1:] / sizes[1:], y[-1]]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    kept = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((x[kept] - next_x[bucket]) * (y[start:end] - y[kept])
+                      - (x[kept] - x[start:end]) * (next_y[bucket] - y[kept]))
+        kept = start + int(area.argmax())
+        selected[bucket + 1] = kept
+    return selected
+
+
+def downsample(series, max_points=MAX_POINTS):
+    """``series`` reduced to at most ``max_points`` points with LTTB.
+
+    The index is the x axis; datetime indexes are compared as timestamps.
+    """
+    if len(series) <= max_points:
+        return series
+    index = series.index
+    x = index.asi8 if hasattr(index, 'asi8') else np.asarray(index, dtype=float)
+    return series.iloc[lttb(x, series.to_numpy(dtype=float), max_points)]
+
+
+class FigureCache:
+    """Most recently used figures by key, shared by every session.
+
+    Figures are drawn as they are and must not be modified once cached.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._figures = OrderedDict()
+
+    def get(self, key, build):
+        """The figure for ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                perf.count('figure_cache_hits_total')
+                return figure
+        perf.count('figure_cache_misses_total')
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def __len__(self):
+        return len(self._figures)
@@ -0,0 +1,217 @@
+"""Clinic-wide adherence over a patient-keyed dose log.
+
+A clinic's cohort log keeps every patient's doses in one ``DoseStore``.
+Patients are split into partitions of ``PARTITION_PATIENTS`` consecutive ids.
+Each partition is summarized by ``summarize_partition`` over its own
+read-only connection, in a process pool when there is more than one CPU, and
+the per-patient results are merged into cached summary tables. New doses only
+mark their own partitions stale, so a refresh re-reads just those patients.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from itertools import repeat
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from medtracker import perf
+from medtracker.records import STATUSES
+
+# Patient ids summarized together by one worker task
+PARTITION_PATIENTS = 500
+# Days of recent history the risk measures look at
+RECENT_DAYS = 14
+# Patients below this recent adherence (%) are at risk
+AT_RISK_ADHERENCE = 80
+# As are patients who have missed this many days in a row
+AT_RISK_MISSES = 2
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_TAKEN, _MISSED, _DELAYED = (_STATUS_CODES[s] for s in ('Taken', 'Missed', 'Delayed'))
+
+
+def summarize_partition(path, lo, hi, today):
+    """Summarize the doses of patients ``lo <= patient_id < hi``.
+
+    Runs in a worker process. Returns ``(patients, medications, counts,
+    misses)``: ``counts`` is shaped ``(patients, medications, statuses, 2)``
+    with all-time and last-``RECENT_DAYS`` counts, and ``misses`` is each
+    patient's run of missed days up to their last logged day (zero when that
+    day is before yesterday).
+    """
+    recent_start = today - timedelta(days=RECENT_DAYS - 1)
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        # Both queries are answered from the (patient_id, medication, status, date) index.
+        # Doses dated after ``today`` (imports accept them) fall outside the recent window.
+        counts = conn.execute(
+            'SELECT patient_id, medication, status, COUNT(*), SUM(date >= ? AND date <= ?) FROM doses '
+            'WHERE patient_id >= ? AND patient_id < ? GROUP BY 1, 2, 3',
+            (recent_start.isoformat(), today.isoformat(), lo, hi)).fetchall()
+        days = conn.execute(
+            "SELECT patient_id, date, MAX(status = 'Missed') FROM doses "
+            'WHERE patient_id >= ? AND patient_id < ? AND date >= ? AND date <= ? GROUP BY 1, 2',
+            (lo, hi, recent_start.isoformat(), today.isoformat())).fetchall()
+    finally:
+        conn.close()
+    if not counts:
+        return np.zeros(0, dtype=np.int64), [], np.zeros((0, 0, len(STATUSES), 2), dtype=np.int64), \
+            np.zeros(0, dtype=np.int64)
+
+    patient_ids, medications, statuses, totals, recent = zip(*counts)
+    patients, patient_idx = np.unique(np.array(patient_ids, dtype=np.int64), return_inverse=True)
+    names, med_idx = np.unique(np.array(medications, dtype=object), return_inverse=True)
+    status_idx = np.array([_STATUS_CODES[status] for status in statuses], dtype=np.intp)
+    # Each group appears once, so plain fancy assignment is enough
+    table = np.zeros((len(patients), len(names), len(STATUSES), 2), dtype=np.int64)
+    table[patient_idx, med_idx, status_idx, 0] = totals
+    table[patient_idx, med_idx, status_idx, 1] = recent
+
+    # Day states over the recent window: -1 no doses, 0 kept, 1 missed
+    states = np.full((len(patients), RECENT_DAYS), -1, dtype=np.int8)
+    if days:
+        day_patients, day_dates, missed = zip(*days)
+        rows = np.searchsorted(patients, np.array(day_patients, dtype=np.int64))
+        offsets = (np.array(day_dates, dtype='datetime64[D]') - np.datetime64(recent_start, 'D')).astype(np.int64)
+        states[rows, offsets] = missed
+    # Count missed days back from each patient's last logged day
+    backwards = states[:, ::-1]
+    logged = backwards >= 0
+    last = np.where(logged.any(axis=1), logged.argmax(axis=1), RECENT_DAYS)
+    before_last = np.arange(RECENT_DAYS)[None, :] < last[:, None]
+    run = (backwards == 1) | before_last
+    run_end = np.where(run.all(axis=1), RECENT_DAYS, run.argmin(axis=1))
+    misses = np.where(last <= 1, run_end - last, 0)
+    return patients, list(names), table, misses
+
+
+def _merge(partitions):
+    """Stack partition results into ``(patients, medications, counts, misses)``."""
+    medications = sorted({name for _, names, _, _ in partitions for name in names})
+    codes = {name: code for code, name in enumerate(medications)}
+    n_patients = sum(len(patients) for patients, _, _, _ in partitions)
+    counts = np.zeros((n_patients, len(medications), len(STATUSES), 2), dtype=np.int64)
+    start = 0
+    for patients, names, table, _ in partitions:
+        end = start + len(patients)
+        counts[start:end, [codes[name] for name in names]] = table
+        start = end
+    patients = np.concatenate([p for p, _, _, _ in partitions]) if partitions else np.zeros(0, dtype=np.int64)
+    misses = np.concatenate([m for _, _, _, m in partitions]) if partitions else np.zeros(0, dtype=np.int64)
+    return patients, medications, counts, misses
+
+
+def _tables(patients, medications, counts, misses):
+    """Per-patient and per-medication summary frames."""
+    per_patient = counts.sum(axis=1)
+    overall, recent = per_patient[:, :, 0], per_patient[:, :, 1]
+    total, recent_total = overall.sum(axis=1), recent.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        adherence = overall[:, _TAKEN] / total * 100
+        recent_adherence = recent[:, _TAKEN] / recent_total * 100
+    at_risk = (recent_total == 0) | (recent_adherence < AT_RISK_ADHERENCE) | (misses >= AT_RISK_MISSES)
+    by_patient = pd.DataFrame({
+        'doses': total,
+        'adherence': adherence,
+        'recent_adherence': recent_adherence,
+        'missed_days_in_a_row': misses,
+        'at_risk': at_risk,
+    }, index=pd.Index(patients, name='patient_id'))
+
+    per_medication = counts[..., 0].sum(axis=0)
+    med_total = per_medication.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        by_medication = pd.DataFrame({
+            'doses': med_total,
+            'miss_rate': per_medication[:, _MISSED] / med_total * 100,
+            'delay_rate': per_medication[:, _DELAYED] / med_total * 100,
+        }, index=pd.Index(medications, name='medication'))
+    return {'patients': by_patient, 'by_medication': by_medication}
+
+
+class CohortAnalytics:
+    """Cached clinic summary tables, refreshed partition by partition."""
+
+    def __init__(self, store, workers=None):
+        self.store = store
+        self.workers = workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        # Guards only the stale set, which the store's listener updates
+        self._stale_lock = threading.Lock()
+        self._stale = set()
+        self._pool = None
+        self._partitions = {}
+        self._day = None
+        self._tables = None
+        store.subscribe(self.apply)
+        atexit.register(self.close)
+
+    def apply(self, doses):
+        """Mark the partitions of a batch of new doses for re-reading."""
+        partitions = np.unique(doses.patient_ids // PARTITION_PATIENTS).tolist()
+        with self._stale_lock:
+            self._stale.update(partitions)
+
+    def _summarize(self, partitions, today):
+        los = [partition * PARTITION_PATIENTS for partition in partitions]
+        his = [lo + PARTITION_PATIENTS for lo in los]
+        args = (repeat(self.store.path), los, his, repeat(today))
+        # A pool only pays off with a CPU per worker and more than one task
+        if self.workers < 2 or len(partitions) < 2:
+            return list(map(summarize_partition, *args))
+        if self._pool is None:
+            # Spawned, not forked: the app process has server threads running
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=get_context('spawn'))
+        return list(self._pool.map(summarize_partition, *args))
+
+    def _refresh(self, today):
+        with self._stale_lock:
+            stale, self._stale = self._stale, set()
+        if today != self._day:
+            # Recent windows moved, so every partition is out of date
+            self._partitions.clear()
+        patient_range = self.store.patient_range()
+        if patient_range is None:
+            partitions = []
+        else:
+            partitions = list(range(patient_range[0] // PARTITION_PATIENTS,
+                                    patient_range[1] // PARTITION_PATIENTS + 1))
+        todo = [partition for partition in partitions if partition in stale or partition not in self._partitions]
+        if not todo and self._tables is not None:
+            return
+        with perf.span('cohort.summarize'):
+            self._partitions.update(zip(todo, self._summarize(todo, today)))
+        perf.count('cohort_partitions_summarized_total', len(todo))
+        with perf.span('cohort.merge'):
+            self._tables = _tables(*_merge([self._partitions[partition] for partition in partitions]))
+        self._day = today
+
+    def summary(self, today=None):
+        """``{'patients', 'by_medication'}`` summary frames for the whole cohort.
+
+        ``patients`` has each patient's dose count, all-time and recent
+        adherence (%), current missed days in a row and an ``at_risk`` flag;
+        ``by_medication`` the miss and delay rates (%) per medication.
+        """
+        with self._lock:
+            self._refresh(today or date.today())
+            return self._tables
+
+    def at_risk(self, today=None, limit=None):
+        """At-risk patients, most consecutive missed days then lowest recent adherence first."""
+        patients = self.summary(today)['patients']
+        ranked = patients[patients['at_risk']].sort_values(
+            ['missed_days_in_a_row', 'recent_adherence'], ascending=[False, True], na_position='first')
+        return ranked if limit is None else ranked.head(limit)
+
+    def close(self):
+        """Shut down the worker processes; a later refresh starts new ones."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -0,0 +1,100 @@
+"""Seeded, vectorized synthetic dose logs for demos and load tests.
+
+Every draw is made for the whole ``patients x days x medications`` cube at
+once with NumPy, so generating millions of rows takes well under a second.
+
+The model is deliberately simple but shaped like real DOT data:
+
+* each patient has a base adherence drawn around ``adherence`` and a linear
+  drift over the course, so some patients slip and some improve;
+* adherence dips at weekends;
+* "bad days" make a patient miss every medication that day, which produces
+  runs of consecutive misses;
+* dose times jitter around the scheduled time; doses taken more than an hour
+  late are recorded as Delayed.
+"""
+import numpy as np
+import pandas as pd
+
+from medtracker.records import NO_TIME, STATUSES, local_epochs
+
+TAKEN, MISSED, DELAYED = (STATUSES.index(s) for s in ('Taken', 'Missed', 'Delayed'))
+
+DEFAULT_DOSE_TIME = '08:00'
+
+
+def _scheduled_minute(med):
+    text = (med.get('next_dose') if isinstance(med, dict) else None) or DEFAULT_DOSE_TIME
+    hour, minute = map(int, text.split(':'))
+    return hour * 60 + minute
+
+
+def generate_doses(medications, days=180, patients=1, end=None, seed=0, adherence=0.85,
+                   drift=0.10, weekend_dip=0.04, bad_day_rate=0.03, delayed_share=0.5):
+    """Generate one dose per patient, day and medication.
+
+    ``medications`` are medication dicts (``name`` and optional ``next_dose``)
+    or plain names. The log covers the ``days`` days ending on ``end``
+    (default today). Returns a frame with ``patient_id`` (int32), ``date``
+    (datetime64), categorical ``medication``/``status``, ``hour``/``minute``
+    (int8) and ``scheduled_at``/``taken_at`` epoch seconds (int64, ``taken_at``
+    is ``NO_TIME`` for missed doses), ordered by patient, date and medication.
+    """
+    rng = np.random.default_rng(seed)
+    names = [med['name'] if isinstance(med, dict) else med for med in medications]
+    scheduled = np.array([_scheduled_minute(med) for med in medications], dtype=np.int32)
+    n_meds = len(names)
+
+    end = np.datetime64(end or pd.Timestamp.now().date(), 'D')
+    dates = end - np.arange(days - 1, -1, -1)
+    progress = np.linspace(0.0, 1.0, days)
+
+    # Per-patient adherence level and drift over the course
+    concentration = 20.0
+    base = rng.beta(adherence * concentration, (1 - adherence) * concentration, size=patients)
+    slope = rng.normal(0.0, drift, size=patients)
+    # 1970-01-01 was a Thursday; weekday 5 and 6 are Saturday and Sunday
+    weekend = (dates.view('int64') + 3) % 7 >= 5
+    p_take = base[:, None] + slope[:, None] * progress[None, :] - weekend_dip * weekend[None, :]
+    p_take = np.clip(p_take, 0.0, 1.0)
+
+    bad_day = rng.random((patients, days)) < bad_day_rate
+    draw = rng.random((patients, days, n_meds))
+    on_time = (draw < p_take[:, :, None]) & ~bad_day[:, :, None]
+    # Of the doses not taken on time, a share is taken late rather than missed
+    late = ~on_time & ~bad_day[:, :, None] & (rng.random(draw.shape) < delayed_share)
+
+    status = np.full(draw.shape, MISSED, dtype=np.int8)
+    status[on_time] = TAKEN
+    status[late] = DELAYED
+
+    offset = rng.normal(0.0, 20.0, size=draw.shape)
+    offset = np.where(late, rng.uniform(61.0, 240.0, size=draw.shape), np.clip(offset, -60.0, 60.0))
+    minute_of_day = (scheduled[None, None, :] + offset.astype(np.int32)) % (24 * 60)
+
+    # Localize the (date, medication) schedule grid once and broadcast it over patients
+    scheduled_at = local_epochs(dates[:, None] + scheduled[None, :].astype('timedelta64[m]')).reshape(days, n_meds)
+    taken_at = np.where(status == MISSED, NO_TIME, scheduled_at[None] + (offset * 60).astype(np.int64))
+
+    rows = patients * days * n_meds
+    return pd.DataFrame({
+        'patient_id': np.repeat(np.arange(patients, dtype=np.int32), days * n_meds),
+        'date': np.tile(np.repeat(dates, n_meds), patients).astype('datetime64[ns]'),
+        'medication': pd.Categorical.from_codes(np.tile(np.arange(n_meds), patients * days), categories=names),
+        'status': pd.Categorical.from_codes(status.reshape(rows), categories=list(STATUSES)),
+        'hour': (minute_of_day // 60).astype(np.int8).reshape(rows),
+        'minute': (minute_of_day % 60).astype(np.int8).reshape(rows),
+        'scheduled_at': np.broadcast_to(scheduled_at[None], draw.shape).reshape(rows),
+        'taken_at': taken_at.reshape(rows),
+    })
+
+
+def dose_records(frame):
+    """Dose dicts for ``DoseStore.append_many`` from a generated frame."""
+    dates = frame['date'].dt.strftime('%Y-%m-%d')
+    for patient, medication, date, status, taken_at, scheduled_at in zip(
+            frame['patient_id'].tolist(), frame['medication'].astype(str), dates, frame['status'].astype(str),
+            frame['taken_at'].tolist(), frame['scheduled_at'].tolist()):
+        yield {'medication': medication, 'date': date, 'status': status, 'notes': '',
+               'taken_at': None if taken_at == NO_TIME else taken_at, 'scheduled_at': scheduled_at,
+               'patient_id': patient}
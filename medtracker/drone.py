@@ -0,0 +1,153 @@
+"""Background drone delivery jobs.
+
+Deliveries run on a thread pool owned by the app process. The script thread
+only submits jobs and reads their status, so a delivery never blocks a rerun.
+With the default single worker, deliveries for the one household drone queue
+behind each other.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from medtracker.routing import RoutePlanner
+
+QUEUED = 'Queued'
+IN_FLIGHT = 'In Flight'
+RETURNING = 'Returning'
+DELIVERED = 'Delivered'
+FAILED = 'Failed'
+
+ACTIVE_STATUSES = (QUEUED, IN_FLIGHT, RETURNING)
+
+# How often the Drone Service page re-reads job state while a delivery runs
+POLL_SECONDS = 0.5
+
+
+class DeliveryJob:
+    """Status and progress of a single delivery."""
+
+    def __init__(self, job_id, stops, avoid_stairs, return_to_base, on_finish=None):
+        self.id = job_id
+        self.stops = tuple(stops)
+        self.destination = ', '.join(self.stops)
+        self.avoid_stairs = avoid_stairs
+        self.return_to_base = return_to_base
+        self.route = None
+        self.status = QUEUED
+        self.progress = 0
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.on_finish = on_finish
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATUSES
+
+    def snapshot(self):
+        return {
+            'id': self.id,
+            'destination': self.destination,
+            'route': ' → '.join(self.route.path) if self.route else None,
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+        }
+
+
+class DeliveryJobManager:
+    """Runs delivery simulations as jobs on a thread pool.
+
+    Each job plans its route from wherever the drone is when the job starts.
+    ``steps`` progress ticks of ``step_seconds`` make up the outbound flight;
+    the return leg takes ``return_seconds``. At most ``history`` finished jobs
+    are kept.
+    """
+
+    def __init__(self, planner=None, max_workers=1, steps=100, step_seconds=0.02, return_seconds=1.0,
+                 history=50):
+        self.planner = planner or RoutePlanner()
+        self.location = self.planner.base
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='drone')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self.steps = steps
+        self.step_seconds = step_seconds
+        self.return_seconds = return_seconds
+        self.history = history
+
+    def submit(self, stops, avoid_stairs=True, return_to_base=True, on_finish=None):
+        """Queue a sortie delivering to every room in ``stops``; returns its job id.
+
+        ``on_finish(snapshot)`` is called from the worker thread once the job
+        has been delivered or has failed.
+        """
+        with self._lock:
+            job = DeliveryJob(next(self._ids), stops, avoid_stairs, return_to_base, on_finish)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job.id
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        try:
+            route = job.route = self.planner.route(
+                self.location, tuple(sorted(job.stops)), job.avoid_stairs, job.return_to_base)
+            job.status = IN_FLIGHT
+            # Outbound leg ends at the last delivery; the rest is the way home
+            outbound = route.path[:len(route.path) - route.path[::-1].index(route.stops[-1])] \
+                if route.stops else route.path[:1]
+            legs = [self.planner.distance(a, b, job.avoid_stairs) for a, b in zip(outbound, outbound[1:])]
+            total = sum(legs) or 1
+            hop, flown = 0, 0.0
+            for step in range(1, self.steps + 1):
+                time.sleep(self.step_seconds)
+                job.progress = step * 100 // self.steps
+                while hop < len(legs) and flown + legs[hop] <= total * step / self.steps:
+                    flown += legs[hop]
+                    hop += 1
+                    self.location = outbound[hop]
+            self.location = outbound[-1]
+            if job.return_to_base and self.location != self.planner.base:
+                job.status = RETURNING
+                time.sleep(self.return_seconds)
+                self.location = self.planner.base
+            job.status = DELIVERED
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = FAILED
+        job.finished = time.time()
+        if job.on_finish is not None:
+            job.on_finish(job.snapshot())
+
+    def get(self, job_id):
+        """Snapshot of a job, or ``None`` once it has been pruned."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def jobs(self, job_ids=None):
+        """Snapshots of the given jobs (or all jobs), newest first."""
+        with self._lock:
+            ids = reversed(self._jobs) if job_ids is None else sorted(job_ids, reverse=True)
+            return [self._jobs[job_id].snapshot() for job_id in ids if job_id in self._jobs]
+
+    @property
+    def drone_status(self):
+        """'Available' when no delivery is queued or running."""
+        with self._lock:
+            active = [job for job in self._jobs.values() if job.active]
+        if not active:
+            return 'Available'
+        return 'Delivering' if any(job.status == IN_FLIGHT for job in active) else active[0].status
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
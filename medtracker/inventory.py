@@ -0,0 +1,104 @@
+"""Medication stock forecasting from logged doses.
+
+Each taken dose uses one unit of stock. The consumption rate per medication
+is measured from the doses taken over a recent window (falling back to the
+prescribed rate when there is no history yet), and the days left until the
+refill threshold and until running out are plain array arithmetic. The same
+functions work on ``(patients, medications)`` arrays for a whole cohort.
+
+Stock is not persisted. It lives in each session's medication list, starting
+from the sample data, while consumption is measured from the shared dose log,
+so forecasts are per session: a dose one session logs moves every session's
+rates but only its own stock.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from medtracker.records import STATUSES
+from medtracker.schedule import FREQUENCY_OFFSETS
+
+# Days of history the consumption rate is measured over
+LOOKBACK_DAYS = 14
+# Refills are suggested this many days before stock reaches its threshold
+REFILL_LEAD_DAYS = 7
+# A refill tops stock up by this many days of consumption
+REFILL_DAYS_SUPPLY = 30
+
+_USED = [STATUSES.index('Taken'), STATUSES.index('Delayed')]
+
+
+def use_stock(medications, name, units=1):
+    """Take ``units`` of ``name`` out of stock in a session's medication list.
+
+    Entries may be shared baseline mappings, so the entry is replaced rather
+    than edited in place.
+    """
+    for idx, med in enumerate(medications):
+        if med['name'] == name:
+            medications[idx] = {**med, 'stock': max(med['stock'] - units, 0)}
+            return
+
+
+def restock(medications, quantities):
+    """Add ``{name: units}`` to stock in a session's medication list."""
+    for idx, med in enumerate(medications):
+        if med['name'] in quantities:
+            medications[idx] = {**med, 'stock': med['stock'] + int(quantities[med['name']])}
+
+
+def prescribed_rates(medications):
+    """Units per day implied by each medication's ``frequency``."""
+    return np.array([len(FREQUENCY_OFFSETS.get(med['frequency'], (0,))) for med in medications], dtype=float)
+
+
+def consumption_rates(day_index, medications, today, lookback=LOOKBACK_DAYS):
+    """Units used per day over the last ``lookback`` days, per medication.
+
+    Medications with no doses logged in the window, or every medication when
+    there is no ``day_index`` or the window holds no doses at all (a log that
+    stopped before it, say), use their prescribed rate.
+    """
+    if day_index is None or day_index.last_day is None or day_index.last_day < today - timedelta(days=lookback - 1):
+        return prescribed_rates(medications)
+    counts = day_index.medication_counts(today - timedelta(days=lookback - 1), today,
+                                         [med['name'] for med in medications])
+    used = counts[:, _USED].sum(axis=1) / lookback
+    return np.where(counts.sum(axis=1) > 0, used, prescribed_rates(medications))
+
+
+def forecast(stock, threshold, rate):
+    """Days until stock reaches ``threshold`` and until it runs out.
+
+    Arguments broadcast against each other; a zero rate never depletes, so
+    its days are ``inf``.
+    """
+    stock, threshold, rate = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (stock, threshold, rate)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        to_threshold = np.where(rate > 0, np.maximum(stock - threshold, 0) / rate, np.inf)
+        to_empty = np.where(rate > 0, stock / rate, np.inf)
+    to_threshold = np.where(stock <= threshold, 0.0, to_threshold)
+    return to_threshold, to_empty
+
+
+def stock_forecast(medications, day_index, today):
+    """Per-medication stock, consumption rate and depletion dates as a frame."""
+    medications = list(medications)
+    rates = consumption_rates(day_index, medications, today)
+    stock = np.array([med['stock'] for med in medications], dtype=float)
+    threshold = np.array([med['refill_threshold'] for med in medications], dtype=float)
+    to_threshold, to_empty = forecast(stock, threshold, rates)
+    return pd.DataFrame({
+        'stock': stock.astype(int),
+        'refill_threshold': threshold.astype(int),
+        'rate': rates,
+        'days_to_threshold': to_threshold,
+        'days_to_empty': to_empty,
+    }, index=pd.Index([med['name'] for med in medications], name='medication'))
+
+
+def refill_quantities(forecast_frame, lead_days=REFILL_LEAD_DAYS, days_supply=REFILL_DAYS_SUPPLY):
+    """Units to order for medications due to reach their threshold within ``lead_days``."""
+    due = forecast_frame[forecast_frame['days_to_threshold'] <= lead_days]
+    return np.ceil(np.maximum(due['rate'], 1) * days_supply).astype(int)
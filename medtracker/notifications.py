@@ -0,0 +1,197 @@
+"""Event-driven notification rules.
+
+Pages publish domain events (a dose was logged, a medication's stock changed,
+a delivery finished) to a session's ``NotificationEngine``. Each rule is
+registered for the event types it cares about, so an event only runs the
+rules it can affect. Rules post or resolve notifications in a bounded queue
+that deduplicates by key and drops entries once they expire.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
+
+from medtracker.inventory import REFILL_LEAD_DAYS, stock_forecast
+
+SESSION_STARTED = 'session_started'
+DOSE_LOGGED = 'dose_logged'
+STOCK_CHANGED = 'stock_changed'
+REMINDER_PASSED = 'reminder_passed'
+DELIVERY_FINISHED = 'delivery_finished'
+
+# Streaks this long or longer are celebrated
+STREAK_DAYS = 7
+# Consecutive missed days that escalate a missed-dose alert
+MISS_ALERT_DAYS = 2
+
+RULES = []
+
+
+def rule(*event_types):
+    """Register the decorated ``rule(engine, event)`` for ``event_types``."""
+    def register(func):
+        RULES.extend((event_type, func) for event_type in event_types)
+        return func
+    return register
+
+
+class Notification:
+    """One message in the notification center."""
+
+    __slots__ = ('key', 'type', 'message', 'created', 'expires')
+
+    def __init__(self, key, type, message, ttl=None):
+        self.key = key
+        # 'success', 'info' or 'warning'
+        self.type = type
+        self.message = message
+        self.created = time.time()
+        self.expires = self.created + ttl if ttl else None
+
+    def __getitem__(self, field):
+        return getattr(self, field)
+
+
+class NotificationQueue:
+    """Newest-last notifications, unique per key, at most ``max_size`` of them."""
+
+    def __init__(self, max_size=20):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def post(self, notification):
+        """Add ``notification``, replacing any with the same key."""
+        self._items.pop(notification.key, None)
+        self._items[notification.key] = notification
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def resolve(self, key):
+        self._items.pop(key, None)
+
+    def active(self, now=None):
+        """Unexpired notifications, oldest first."""
+        now = now or time.time()
+        expired = [key for key, item in self._items.items() if item.expires is not None and item.expires <= now]
+        for key in expired:
+            del self._items[key]
+        return list(self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+
+class NotificationEngine:
+    """Runs the rules registered for each published event.
+
+    ``context`` is handed to the rules (e.g. ``streaks``, a ``StreakTracker``).
+    Publishing is thread-safe, so background jobs can report back directly.
+    """
+
+    def __init__(self, rules=None, max_size=20, **context):
+        self.queue = NotificationQueue(max_size)
+        self.context = context
+        self._rules = defaultdict(list)
+        for event_type, func in RULES if rules is None else rules:
+            self._rules[event_type].append(func)
+        self._lock = threading.Lock()
+        self._last_tick = None
+
+    def publish(self, event_type, **event):
+        with self._lock:
+            for func in self._rules[event_type]:
+                func(self, event)
+
+    def notify(self, key, type, message, ttl=None):
+        self.queue.post(Notification(key, type, message, ttl))
+
+    def resolve(self, key):
+        self.queue.resolve(key)
+
+    def tick(self, schedule, now=None):
+        """Publish ``REMINDER_PASSED`` for doses that fell due since the last tick."""
+        now = now or datetime.now()
+        last, self._last_tick = self._last_tick, now
+        if last is None or now <= last:
+            return
+        for item in schedule.occurrences(last, now):
+            self.publish(REMINDER_PASSED, **item)
+
+    def active(self):
+        with self._lock:
+            return self.queue.active()
+
+
+@rule(SESSION_STARTED, STOCK_CHANGED)
+def refill_due(engine, event):
+    # Forecast every medication in the event at once from its recent consumption
+    forecast = stock_forecast(event['medications'], engine.context.get('day_index'), date.today())
+    for medication, stock, days in zip(forecast.index, forecast['stock'], forecast['days_to_threshold']):
+        key = f"refill:{medication}"
+        if days <= 0:
+            engine.notify(key, 'warning', f"{medication} stock is running low ({stock} left). Consider refilling soon.")
+        elif days <= REFILL_LEAD_DAYS:
+            engine.notify(key, 'info', f"{medication} will reach its refill threshold in about "
+                                       f"{math.ceil(days)} days. Request a refill soon.")
+        else:
+            engine.resolve(key)
+
+
+@rule(SESSION_STARTED, DOSE_LOGGED)
+def adherence_streak(engine, event):
+    streaks = engine.context.get('streaks')
+    if streaks is None:
+        return
+    streak = streaks.summary(today=event.get('date') or date.today())['current_streak']
+    if streak >= STREAK_DAYS:
+        engine.notify('streak', 'success', f"Perfect medication adherence streak: {streak} days!",
+                      ttl=timedelta(days=1).total_seconds())
+    else:
+        engine.resolve('streak')
+
+
+@rule(DOSE_LOGGED)
+def missed_dose(engine, event):
+    medication = event['medication']
+    if event.get('status') != 'Missed':
+        engine.resolve(f"missed:{medication}")
+        return
+    streaks = engine.context.get('streaks')
+    misses = streaks.summary(medication, event.get('date'))['current_misses'] if streaks else 1
+    if misses >= MISS_ALERT_DAYS:
+        message = f"{medication} has been missed {misses} days in a row. Please contact your care team."
+    else:
+        message = (f"Missed dose of {medication} logged. Take it as soon as you remember "
+                   "unless your next dose is due soon.")
+    engine.notify(f"missed:{medication}", 'warning', message, ttl=timedelta(hours=12).total_seconds())
+
+
+@rule(SESSION_STARTED)
+def consecutive_misses(engine, event):
+    streaks = engine.context.get('streaks')
+    if streaks is None:
+        return
+    for medication, misses in streaks.alerts(MISS_ALERT_DAYS, date.today()).items():
+        engine.notify(f"missed:{medication}", 'warning',
+                      f"{medication} has been missed {misses} days in a row. Please contact your care team.",
+                      ttl=timedelta(hours=12).total_seconds())
+
+
+@rule(REMINDER_PASSED)
+def dose_due(engine, event):
+    when = event['datetime']
+    engine.notify(f"due:{event['medication']}:{when.isoformat()}", 'info',
+                  f"{event['medication']} was due at {when.strftime('%H:%M')}: {event['note']}",
+                  ttl=timedelta(hours=2).total_seconds())
+
+
+@rule(DELIVERY_FINISHED)
+def delivery_finished(engine, event):
+    job = event['job']
+    if job['status'] == 'Failed':
+        engine.notify(f"delivery:{job['id']}", 'warning', f"Delivery #{job['id']} failed: {job['error']}",
+                      ttl=timedelta(hours=1).total_seconds())
+    else:
+        engine.notify(f"delivery:{job['id']}", 'success',
+                      f"Drone delivered medications to {job['destination']}.", ttl=timedelta(hours=1).total_seconds())
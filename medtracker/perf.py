@@ -0,0 +1,168 @@
+"""Opt-in timing spans and counters for the app's hot paths.
+
+Set ``MEDTRACKER_PERF=1`` to enable recording. Spans and counters are kept
+per process; every finished script run is also exported to
+``MEDTRACKER_PERF_EXPORT`` (default ``data/perf.prom``). A ``.prom`` path
+is rewritten in Prometheus text format, and any other path (e.g. ``.jsonl``)
+gets one JSON line per run.
+
+When disabled, ``span`` and ``count`` cost a single attribute check.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from medtracker import DATA_DIR
+
+ENABLED = os.environ.get('MEDTRACKER_PERF', '') not in ('', '0')
+EXPORT_PATH = os.environ.get('MEDTRACKER_PERF_EXPORT', os.path.join(DATA_DIR, 'perf.prom'))
+
+
+class SpanStats:
+    """Running count, total and max of a span's durations, plus recent samples."""
+
+    __slots__ = ('count', 'total', 'max', 'recent')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=200)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def p95(self):
+        samples = sorted(self.recent)
+        return samples[int(0.95 * (len(samples) - 1))] if samples else 0.0
+
+
+class Recorder:
+    """Process-wide span and counter registry."""
+
+    def __init__(self, enabled=ENABLED, export_path=EXPORT_PATH, history=100):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._local = threading.local()
+        self.spans = {}
+        self.counters = Counter()
+        self.runs = deque(maxlen=history)
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block under ``name``."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - started)
+
+    def begin(self, name):
+        """Start a span that is closed with ``end``; for blocks too long to indent."""
+        return (name, time.perf_counter()) if self.enabled else None
+
+    def end(self, token):
+        if token is not None:
+            name, started = token
+            self._record(name, time.perf_counter() - started)
+
+    def _record(self, name, seconds):
+        with self._lock:
+            self.spans.setdefault(name, SpanStats()).add(seconds)
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run['spans'].append((name, seconds))
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += amount
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run['counters'][name] += amount
+
+    def start_run(self, session):
+        """Begin collecting the spans of one script run on this thread."""
+        if self.enabled:
+            self._local.run = {'session': session, 'started': time.time(), 'spans': [], 'counters': Counter()}
+            self.count('reruns_total')
+
+    def finish_run(self):
+        """Close the current run and export the metrics."""
+        run = getattr(self._local, 'run', None)
+        if run is None:
+            return
+        self._local.run = None
+        record = {
+            'ts': run['started'],
+            'session': run['session'],
+            'spans': [{'name': name, 'seconds': seconds} for name, seconds in run['spans']],
+            'counters': dict(run['counters']),
+        }
+        with self._lock:
+            self.runs.append(record)
+        if self.export_path:
+            self._export(record)
+
+    def _export(self, record):
+        directory = os.path.dirname(self.export_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.export_path.endswith('.prom'):
+            text = self.prometheus_text()
+            tmp = f'{self.export_path}.tmp'
+            with self._export_lock:
+                with open(tmp, 'w') as f:
+                    f.write(text)
+                os.replace(tmp, self.export_path)
+        else:
+            with self._export_lock, open(self.export_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def summary(self):
+        """Rows of per-span statistics, slowest total first."""
+        with self._lock:
+            rows = [
+                {
+                    'span': name,
+                    'count': stats.count,
+                    'mean_ms': stats.total / stats.count * 1000,
+                    'p95_ms': stats.p95() * 1000,
+                    'max_ms': stats.max * 1000,
+                    'total_s': stats.total,
+                }
+                for name, stats in self.spans.items()
+            ]
+        return sorted(rows, key=lambda row: row['total_s'], reverse=True)
+
+    def prometheus_text(self):
+        """All spans and counters in the Prometheus text exposition format."""
+        lines = [
+            '# HELP medtracker_span_seconds Time spent in instrumented app spans.',
+            '# TYPE medtracker_span_seconds summary',
+        ]
+        with self._lock:
+            for name, stats in sorted(self.spans.items()):
+                lines.append(f'medtracker_span_seconds_count{{span="{name}"}} {stats.count}')
+                lines.append(f'medtracker_span_seconds_sum{{span="{name}"}} {stats.total:.6f}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'# TYPE medtracker_{name} counter')
+                lines.append(f'medtracker_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+recorder = Recorder()
+span = recorder.span
+count = recorder.count
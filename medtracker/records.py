@@ -0,0 +1,291 @@
+"""Compact, column-oriented container for dose log rows.
+
+A list of dose dicts repeats the medication name, status and ISO date string
+in every row. ``DoseRecords`` instead keeps parallel NumPy columns: an int32
+day number, a small-int medication code into an interned name table and an
+int8 status code, plus the int32 id of the patient the dose belongs to. The
+time each dose was taken and the scheduled occurrence it fulfills are int64
+epoch seconds, ``NO_TIME`` where either is unknown. It still appends and
+iterates like a list of dose dicts, so code written against dicts keeps
+working.
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from dateutil.tz import tzlocal
+
+STATUSES = ('Taken', 'Missed', 'Delayed')
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Placeholder in the timestamp columns for doses logged without a time
+NO_TIME = np.iinfo(np.int64).min
+
+
+def _code_dtype(n_categories):
+    # Same widths pandas picks for categorical codes, so frames can share them
+    if n_categories < 127:
+        return np.int8
+    if n_categories < 32767:
+        return np.int16
+    return np.int32
+
+
+def day_iso(day):
+    """ISO date string for a day number (days since 1970-01-01)."""
+    return date.fromordinal(day + _EPOCH_ORDINAL).isoformat()
+
+
+def epoch_seconds(when):
+    """Epoch seconds for a naive local datetime or an epoch number; ``None`` is ``NO_TIME``."""
+    if when is None:
+        return NO_TIME
+    if isinstance(when, datetime):
+        return int(when.timestamp())
+    return int(when)
+
+
+def local_epochs(moments):
+    """Epoch seconds for an array of naive local datetime64 values, same shape."""
+    moments = np.asarray(moments, dtype='datetime64[ns]')
+    index = pd.DatetimeIndex(moments.ravel())
+    # Repeated wall times at a DST change resolve to standard time
+    local = index.tz_localize(tzlocal(), ambiguous=np.zeros(len(index), dtype=bool), nonexistent='shift_forward')
+    return (local.asi8 // 10 ** 9).reshape(moments.shape)
+
+
+def local_hours(epochs):
+    """Local hour of day (int8) for an array of epoch seconds."""
+    epochs = np.asarray(epochs, dtype=np.int64)
+    # UTC offsets are whole quarter hours, so converting each distinct
+    # quarter hour once is exact and far cheaper than converting every row
+    quarters, inverse = np.unique(epochs.ravel() // 900, return_inverse=True)
+    index = pd.DatetimeIndex(quarters * 900 * 10 ** 9, tz='UTC').tz_convert(tzlocal())
+    return index.hour.to_numpy().astype(np.int8)[inverse].reshape(epochs.shape)
+
+
+class DoseRecords:
+    """Dose rows as parallel arrays with interned medication names.
+
+    Iterating yields ``{'medication', 'date', 'status', 'notes', 'taken_at',
+    'scheduled_at', 'patient_id'}`` dicts with ISO dates and epoch seconds
+    (``None`` when unknown), the same shape ``DoseStore`` used to return.
+    """
+
+    def __init__(self, doses=()):
+        self.medications = []
+        self._codes = {}
+        self._n = 0
+        self._day = np.zeros(0, dtype=np.int32)
+        self._medication = np.zeros(0, dtype=_code_dtype(0))
+        self._status = np.zeros(0, dtype=np.int8)
+        self._taken_at = np.zeros(0, dtype=np.int64)
+        self._scheduled_at = np.zeros(0, dtype=np.int64)
+        self._patient = np.zeros(0, dtype=np.int32)
+        self._notes = []
+        self.extend(doses)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from ``(medication, date, status, notes, taken_at, scheduled_at, patient_id)`` tuples."""
+        records = cls()
+        records._extend_rows(rows)
+        return records
+
+    def append(self, dose):
+        """Append one dose dict."""
+        self.extend((dose,))
+
+    def extend(self, doses):
+        """Append dose dicts, or every row of another ``DoseRecords``."""
+        if isinstance(doses, DoseRecords):
+            self._extend_records(doses)
+            return
+        self._extend_rows((dose['medication'], dose['date'], dose['status'], dose.get('notes') or '',
+                           dose.get('taken_at'), dose.get('scheduled_at'), dose.get('patient_id', 0))
+                          for dose in doses)
+
+    def _extend_records(self, other):
+        if not other:
+            return
+        # Map the other table's medication codes onto this one's
+        codes = np.array([self._code(medication) for medication in other.medications], dtype=np.intp)
+        start, end = self._n, self._n + len(other)
+        self._reserve(end)
+        self._day[start:end] = other.days
+        self._medication[start:end] = codes[other.medication_codes]
+        self._status[start:end] = other.status_codes
+        self._taken_at[start:end] = other.taken_at
+        self._scheduled_at[start:end] = other.scheduled_at
+        self._patient[start:end] = other.patient_ids
+        self._notes.extend(other.notes)
+        self._n = end
+
+    def _extend_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        medications, days, statuses, notes, taken_at, scheduled_at, patients = zip(*rows)
+        try:
+            status_codes = [s if isinstance(s, int) else _STATUS_CODES[s] for s in statuses]
+        except KeyError as exc:
+            raise ValueError(f'Unknown dose status: {exc.args[0]!r}') from None
+        medication_codes = [self._code(medication) for medication in medications]
+        if isinstance(days[0], int):
+            day_numbers = np.array(days, dtype=np.int32)
+        else:
+            day_numbers = np.array(days, dtype='datetime64[D]').astype(np.int32)
+
+        start, end = self._n, self._n + len(rows)
+        self._reserve(end)
+        self._day[start:end] = day_numbers
+        self._medication[start:end] = medication_codes
+        self._status[start:end] = status_codes
+        self._taken_at[start:end] = [epoch_seconds(when) for when in taken_at]
+        self._scheduled_at[start:end] = [epoch_seconds(when) for when in scheduled_at]
+        self._patient[start:end] = patients
+        self._notes.extend(notes)
+        self._n = end
+
+    def _code(self, medication):
+        code = self._codes.get(medication)
+        if code is None:
+            code = self._codes[medication] = len(self.medications)
+            self.medications.append(medication)
+        return code
+
+    def _reserve(self, n):
+        """Grow the columns to hold ``n`` rows and every known medication code."""
+        code_dtype = _code_dtype(len(self.medications))
+        if code_dtype != self._medication.dtype:
+            self._medication = self._medication.astype(code_dtype)
+        capacity = len(self._day)
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity)
+        for name in ('_day', '_medication', '_status', '_taken_at', '_scheduled_at', '_patient'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._n] = column[:self._n]
+            setattr(self, name, grown)
+
+    @property
+    def days(self):
+        """Day numbers (days since 1970-01-01), int32."""
+        return self._day[:self._n]
+
+    @property
+    def medication_codes(self):
+        """Indices into ``medications``."""
+        return self._medication[:self._n]
+
+    @property
+    def status_codes(self):
+        """Indices into ``STATUSES``, int8."""
+        return self._status[:self._n]
+
+    @property
+    def taken_at(self):
+        """When each dose was taken, int64 epoch seconds or ``NO_TIME``."""
+        return self._taken_at[:self._n]
+
+    @property
+    def scheduled_at(self):
+        """The scheduled occurrence each dose fulfills, int64 epoch seconds or ``NO_TIME``."""
+        return self._scheduled_at[:self._n]
+
+    @property
+    def patient_ids(self):
+        """The patient each dose belongs to, int32."""
+        return self._patient[:self._n]
+
+    @property
+    def notes(self):
+        return self._notes
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError('dose record index out of range')
+        return {
+            'medication': self.medications[self._medication[index]],
+            'date': day_iso(int(self._day[index])),
+            'status': STATUSES[self._status[index]],
+            'notes': self._notes[index],
+            'taken_at': _optional_time(int(self._taken_at[index])),
+            'scheduled_at': _optional_time(int(self._scheduled_at[index])),
+            'patient_id': int(self._patient[index]),
+        }
+
+    def __iter__(self):
+        iso = {}
+        meds = self.medications
+        for day, medication, status, note, taken, scheduled, patient in zip(
+                self.days.tolist(), self.medication_codes.tolist(), self.status_codes.tolist(), self._notes,
+                self.taken_at.tolist(), self.scheduled_at.tolist(), self.patient_ids.tolist()):
+            day_text = iso.get(day)
+            if day_text is None:
+                day_text = iso[day] = day_iso(day)
+            yield {'medication': meds[medication], 'date': day_text, 'status': STATUSES[status], 'notes': note,
+                   'taken_at': _optional_time(taken), 'scheduled_at': _optional_time(scheduled),
+                   'patient_id': patient}
+
+    def counts(self):
+        """``{(iso_date, medication, status): n}`` over all rows."""
+        if not self._n:
+            return {}
+        n_meds, n_statuses = max(len(self.medications), 1), len(STATUSES)
+        keys = (self.days.astype(np.int64) * n_meds + self.medication_codes) * n_statuses + self.status_codes
+        keys, totals = np.unique(keys, return_counts=True)
+        statuses, rest = keys % n_statuses, keys // n_statuses
+        medications, days = rest % n_meds, rest // n_meds
+        iso = {day: day_iso(day) for day in np.unique(days).tolist()}
+        return {
+            (iso[day], self.medications[medication], STATUSES[status]): total
+            for day, medication, status, total in zip(days.tolist(), medications.tolist(), statuses.tolist(),
+                                                      totals.tolist())
+        }
+
+    def select(self, mask):
+        """A new ``DoseRecords`` with the rows where boolean ``mask`` is set."""
+        records = DoseRecords()
+        records.medications = list(self.medications)
+        records._codes = dict(self._codes)
+        records._medication = self.medication_codes[mask]
+        records._day = self.days[mask]
+        records._status = self.status_codes[mask]
+        records._taken_at = self.taken_at[mask]
+        records._scheduled_at = self.scheduled_at[mask]
+        records._patient = self.patient_ids[mask]
+        records._notes = [note for note, keep in zip(self._notes, mask.tolist()) if keep]
+        records._n = len(records._day)
+        return records
+
+    def to_frame(self):
+        """Typed frame with ``date`` (datetime64), categorical ``medication`` and ``status``.
+
+        ``hour`` is the local hour each dose was taken (int8, -1 when
+        unknown). The categorical codes share memory with the record columns;
+        only the dates are widened to datetime64.
+        """
+        taken_at = self.taken_at
+        timed = taken_at != NO_TIME
+        hour = np.full(self._n, -1, dtype=np.int8)
+        if timed.any():
+            hour[timed] = local_hours(taken_at[timed])
+        return pd.DataFrame({
+            'date': self.days.astype('datetime64[D]').astype('datetime64[ns]'),
+            'medication': pd.Categorical.from_codes(self.medication_codes, categories=self.medications),
+            'status': pd.Categorical.from_codes(self.status_codes, categories=list(STATUSES)),
+            'hour': hour,
+        }, copy=False)
+
+
+def _optional_time(epoch):
+    return None if epoch == NO_TIME else epoch
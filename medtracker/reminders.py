@@ -0,0 +1,59 @@
+"""Day-bucketed reminder index.
+
+Reminders are stored as epoch seconds, bucketed by local calendar day and
+kept sorted inside each bucket, so a day's timeline is a dict lookup. A heap
+over all reminders answers "what is due next" by peeking at its head.
+"""
+import heapq
+from bisect import insort
+from datetime import datetime
+
+
+class ReminderIndex:
+    """One-off medication reminders keyed by when they are due."""
+
+    def __init__(self):
+        self._entries = []
+        self._days = {}
+        self._heap = []
+
+    def add(self, medication, when, note=''):
+        """Index a reminder due at the naive local datetime ``when``."""
+        seq = len(self._entries)
+        epoch = int(when.timestamp())
+        self._entries.append((epoch, medication, note))
+        insort(self._days.setdefault(when.date().toordinal(), []), (epoch, seq))
+        heapq.heappush(self._heap, (epoch, seq))
+
+    def _reminder(self, seq):
+        epoch, medication, note = self._entries[seq]
+        return {'medication': medication, 'datetime': datetime.fromtimestamp(epoch), 'note': note}
+
+    def on_day(self, day):
+        """Reminders due on ``day``, earliest first."""
+        return [self._reminder(seq) for _, seq in self._days.get(day.toordinal(), ())]
+
+    def between(self, start, end):
+        """Reminders due in ``[start, end)``, earliest first."""
+        lo, hi = int(start.timestamp()), int(end.timestamp())
+        found = []
+        for ordinal in range(start.date().toordinal(), end.date().toordinal() + 1):
+            found.extend(seq for epoch, seq in self._days.get(ordinal, ()) if lo <= epoch < hi)
+        return [self._reminder(seq) for seq in found]
+
+    def next_due(self, now):
+        """The earliest reminder due at or after ``now``, or ``None``.
+
+        Reminders that have already passed are dropped from the heap as they
+        surface, so repeated calls stay O(log n) amortized.
+        """
+        cutoff = int(now.timestamp())
+        while self._heap and self._heap[0][0] < cutoff:
+            heapq.heappop(self._heap)
+        return self._reminder(self._heap[0][1]) if self._heap else None
+
+    def __iter__(self):
+        return (self._reminder(seq) for seq in range(len(self._entries)))
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,178 @@
+"""Process-wide resources shared by every session and page.
+
+Each getter is an ``st.cache_resource``, so a resource is built the first time
+any page asks for it and reused afterwards. Modules that pull in pandas or
+NumPy are imported inside the getters, so pages that don't need them never
+pay for the import.
+"""
+import os
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from medtracker import DATA_DIR
+from medtracker.store import DoseStore
+
+# Sample medications with TB treatment regimen
+SAMPLE_MEDICATIONS = [
+    {
+        'name': 'Isoniazid (INH)',
+        'dosage': '300mg',
+        'frequency': 'Once daily',
+        'instructions': 'Take on empty stomach',
+        'stock': 45,
+        'refill_threshold': 10,
+        'category': 'TB First-line',
+        'next_dose': '08:00'
+    },
+    {
+        'name': 'Rifampin (RIF)',
+        'dosage': '600mg',
+        'frequency': 'Once daily',
+        'instructions': 'Take 1 hour before meals',
+        'stock': 60,
+        'refill_threshold': 15,
+        'category': 'TB First-line',
+        'next_dose': '08:00'
+    },
+    {
+        'name': 'Pyrazinamide (PZA)',
+        'dosage': '1500mg',
+        'frequency': 'Once daily',
+        'instructions': 'Take with food',
+        'stock': 40,
+        'refill_threshold': 10,
+        'category': 'TB First-line',
+        'next_dose': '08:00'
+    },
+    {
+        'name': 'Ethambutol (EMB)',
+        'dosage': '1200mg',
+        'frequency': 'Once daily',
+        'instructions': 'Take with water',
+        'stock': 35,
+        'refill_threshold': 10,
+        'category': 'TB First-line',
+        'next_dose': '08:00'
+    }
+]
+
+# Patients in the sample clinic cohort log
+COHORT_PATIENTS = int(os.environ.get('MEDTRACKER_COHORT_PATIENTS', '200'))
+
+SAMPLE_PERSONAL_INFO = {
+    'name': 'John Doe',
+    'age': '45',
+    'address': '123 Health St, Medical City, MC 12345',
+    'emergency_contact': 'Jane Doe (555) 123-4567'
+}
+
+
+@st.cache_resource(max_entries=2)
+def get_baseline(day):
+    """Sample data shared by every session started on ``day``."""
+    from medtracker.baseline import Baseline
+
+    return Baseline(SAMPLE_MEDICATIONS, SAMPLE_PERSONAL_INFO, day)
+
+
+@st.cache_resource
+def get_dose_store():
+    store = DoseStore(os.path.join(DATA_DIR, 'doses.sqlite3'))
+    if len(store) == 0:
+        from medtracker.datagen import dose_records, generate_doses
+
+        # Seed a fresh log with 6 months of sample doses up to yesterday
+        sample_doses = generate_doses(SAMPLE_MEDICATIONS, days=180, end=datetime.now().date() - timedelta(days=1))
+        store.append_many(dose_records(sample_doses))
+    return store
+
+
+@st.cache_resource
+def get_dose_writer():
+    from medtracker.writer import DoseWriter
+
+    return DoseWriter(get_dose_store())
+
+
+@st.cache_resource
+def get_cohort_store():
+    store = DoseStore(os.path.join(DATA_DIR, 'cohort.sqlite3'))
+    if len(store) == 0:
+        from medtracker.datagen import dose_records, generate_doses
+
+        # Seed a fresh clinic log with 6 months of sample doses per patient
+        sample_doses = generate_doses(SAMPLE_MEDICATIONS, days=180, patients=COHORT_PATIENTS, seed=1,
+                                      end=datetime.now().date() - timedelta(days=1))
+        store.append_many(dose_records(sample_doses))
+    return store
+
+
+@st.cache_resource
+def get_cohort_analytics():
+    from medtracker.cohort import CohortAnalytics
+
+    return CohortAnalytics(get_cohort_store())
+
+
+@st.cache_resource
+def get_delivery_manager():
+    from medtracker.drone import DeliveryJobManager
+
+    return DeliveryJobManager()
+
+
+@st.cache_resource
+def get_rollups():
+    from medtracker.rollups import AdherenceRollups
+
+    rollups = AdherenceRollups()
+    get_dose_store().subscribe(rollups.apply, replay=True)
+    return rollups
+
+
+@st.cache_resource
+def get_day_index():
+    from medtracker.timeindex import DayIndex
+
+    day_index = DayIndex()
+    get_dose_store().subscribe(day_index.apply, replay=True)
+    return day_index
+
+
+@st.cache_resource
+def get_streaks():
+    from medtracker.streaks import StreakTracker
+
+    streaks = StreakTracker()
+    get_dose_store().subscribe(streaks.apply, replay=True)
+    return streaks
+
+
+@st.cache_resource
+def get_timing():
+    from medtracker.timing import TimingIndex
+
+    timing = TimingIndex()
+    get_dose_store().subscribe(timing.apply, replay=True)
+    return timing
+
+
+@st.cache_resource
+def get_figure_cache():
+    from medtracker.charts import FigureCache
+
+    return FigureCache()
+
+
+@st.cache_resource
+def get_analytics_cache():
+    from medtracker.analytics import AnalyticsCache
+
+    return AnalyticsCache(get_dose_store())
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def check_rollups():
+    # Rebuild the counters from the raw log at most hourly to catch drift
+    return get_dose_store().replay(get_rollups().reconcile)
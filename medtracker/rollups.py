@@ -0,0 +1,69 @@
+"""Incrementally maintained dose counters for the Dashboard cards.
+
+Counters are updated in O(1) per appended dose, so the quick-stats cards never
+have to walk the dose log on a rerun.
+"""
+import threading
+from collections import Counter, defaultdict
+
+from medtracker.records import STATUSES, DoseRecords
+
+
+class AdherenceRollups:
+    """Per-day, per-medication and per-status dose counts."""
+
+    def __init__(self, doses=()):
+        self._lock = threading.Lock()
+        self._reset()
+        self.apply(doses)
+
+    def _reset(self):
+        self.by_status = Counter(dict.fromkeys(STATUSES, 0))
+        self.by_day = defaultdict(Counter)
+        self.by_medication = defaultdict(Counter)
+
+    def apply(self, doses):
+        """Fold a batch of ``DoseRecords`` or dose dicts into the counters."""
+        if not isinstance(doses, DoseRecords):
+            doses = DoseRecords(doses)
+        with self._lock:
+            for (day, medication, status), count in doses.counts().items():
+                self.by_status[status] += count
+                self.by_day[day][status] += count
+                self.by_medication[medication][status] += count
+
+    @property
+    def total(self):
+        return sum(self.by_status.values())
+
+    def day_total(self, day):
+        """Number of doses logged on ``day`` (a date or ISO string)."""
+        key = day if isinstance(day, str) else day.isoformat()
+        counts = self.by_day.get(key)
+        return sum(counts.values()) if counts else 0
+
+    def adherence_rate(self):
+        """Share of all logged doses that were taken, as a percentage."""
+        total = self.total
+        return self.by_status['Taken'] / total * 100 if total else 0.0
+
+    def _state(self):
+        return (
+            {k: v for k, v in self.by_status.items() if v},
+            {day: dict(c) for day, c in self.by_day.items()},
+            {med: dict(c) for med, c in self.by_medication.items()},
+        )
+
+    def reconcile(self, doses):
+        """Rebuild the counters from the raw log.
+
+        Returns ``True`` when the incremental counters already matched it.
+        """
+        rebuilt = AdherenceRollups(doses)
+        with self._lock:
+            consistent = self._state() == rebuilt._state()
+            if not consistent:
+                self.by_status = rebuilt.by_status
+                self.by_day = rebuilt.by_day
+                self.by_medication = rebuilt.by_medication
+        return consistent
@@ -0,0 +1,141 @@
+"""Drone route planning over the house layout.
+
+The house is a weighted graph of rooms. All-pairs shortest paths are computed
+once per constraint set (with and without stairs) using Floyd-Warshall, and
+multi-stop sorties are ordered by solving the small travelling-salesman
+problem over those distances. Route queries are memoized.
+"""
+from functools import lru_cache
+from itertools import permutations
+
+import numpy as np
+
+BASE = 'Kitchen'
+
+# Room -> (icon, floor). Rooms without an icon are waypoints, not destinations.
+ROOMS = {
+    'Living Room': ('🛋️', 'Ground Floor'),
+    'Kitchen': ('🍳', 'Ground Floor'),
+    'Hallway': (None, 'Ground Floor'),
+    'Landing': (None, 'Upstairs'),
+    'Bedroom': ('🛏️', 'Upstairs'),
+    'Bathroom': ('🚽', 'Upstairs'),
+}
+
+# (room, room, flight cost in metres, passes through the stairwell)
+EDGES = [
+    ('Kitchen', 'Living Room', 6, False),
+    ('Kitchen', 'Hallway', 4, False),
+    ('Living Room', 'Hallway', 3, False),
+    ('Hallway', 'Landing', 5, True),
+    # Up through the open atrium above the living room instead of the stairs
+    ('Living Room', 'Landing', 9, False),
+    ('Landing', 'Bedroom', 3, False),
+    ('Landing', 'Bathroom', 2, False),
+    ('Bedroom', 'Bathroom', 4, False),
+]
+
+# Beyond this many stops, orderings fall back to nearest-neighbour
+EXACT_STOPS = 7
+
+
+class Route:
+    """A planned sortie: rooms flown through, delivery order and total cost."""
+
+    __slots__ = ('path', 'stops', 'cost', 'uses_stairs')
+
+    def __init__(self, path, stops, cost, uses_stairs):
+        self.path = path
+        self.stops = stops
+        self.cost = cost
+        self.uses_stairs = uses_stairs
+
+    def __repr__(self):
+        return f"Route({' → '.join(self.path)}, cost={self.cost})"
+
+
+class RoutePlanner:
+    """Shortest paths and multi-stop ordering over a house graph."""
+
+    def __init__(self, rooms=ROOMS, edges=EDGES, base=BASE):
+        self.rooms = list(rooms)
+        self.base = base
+        self.destinations = [room for room, (icon, _) in rooms.items() if icon]
+        self._index = {room: i for i, room in enumerate(self.rooms)}
+        self._stairs = set()
+        for a, b, _, stairs in edges:
+            if stairs:
+                self._stairs.update({(a, b), (b, a)})
+        # Precompute every constraint set up front
+        self._tables = {avoid: self._floyd_warshall(edges, avoid) for avoid in (False, True)}
+        self.route = lru_cache(maxsize=1024)(self._route)
+
+    def _floyd_warshall(self, edges, avoid_stairs):
+        n = len(self.rooms)
+        dist = np.full((n, n), np.inf)
+        np.fill_diagonal(dist, 0)
+        nxt = np.tile(np.arange(n), (n, 1))
+        for a, b, cost, stairs in edges:
+            if stairs and avoid_stairs:
+                continue
+            i, j = self._index[a], self._index[b]
+            dist[i, j] = dist[j, i] = min(dist[i, j], cost)
+        for k in range(n):
+            via = dist[:, k, None] + dist[None, k, :]
+            better = via < dist
+            dist = np.where(better, via, dist)
+            nxt = np.where(better, nxt[:, k, None], nxt)
+        return dist, nxt
+
+    def distance(self, a, b, avoid_stairs=False):
+        dist, _ = self._tables[avoid_stairs]
+        return float(dist[self._index[a], self._index[b]])
+
+    def path(self, a, b, avoid_stairs=False):
+        """Rooms on the shortest path from ``a`` to ``b``, both included."""
+        dist, nxt = self._tables[avoid_stairs]
+        i, j = self._index[a], self._index[b]
+        if not np.isfinite(dist[i, j]):
+            raise ValueError(f'No route from {a} to {b}')
+        rooms = [a]
+        while i != j:
+            i = nxt[i, j]
+            rooms.append(self.rooms[i])
+        return rooms
+
+    def _order(self, start, stops, avoid_stairs, end):
+        dist, _ = self._tables[avoid_stairs]
+        idx = self._index
+
+        def tour_cost(order):
+            legs = [start, *order] + ([end] if end else [])
+            return sum(dist[idx[a], idx[b]] for a, b in zip(legs, legs[1:]))
+
+        if len(stops) <= EXACT_STOPS:
+            return min(permutations(stops), key=tour_cost)
+        order, here, remaining = [], start, set(stops)
+        while remaining:
+            here = min(remaining, key=lambda room: (dist[idx[here], idx[room]], room))
+            order.append(here)
+            remaining.remove(here)
+        return tuple(order)
+
+    def _route(self, start, stops, avoid_stairs=False, return_to_base=True):
+        """Plan a sortie from ``start`` visiting every room in ``stops``.
+
+        ``stops`` must be hashable (a tuple or frozenset); order is chosen by
+        the planner. When ``avoid_stairs`` leaves no way to a stop, the stairs
+        are used after all.
+        """
+        stops = tuple(sorted(set(stops) - {start}))
+        end = self.base if return_to_base else None
+        if avoid_stairs and not all(np.isfinite(self.distance(start, stop, True)) for stop in stops):
+            avoid_stairs = False
+        order = self._order(start, stops, avoid_stairs, end)
+        legs = [start, *order] + ([end] if end and (order or start != end) else [])
+        path = [start]
+        for a, b in zip(legs, legs[1:]):
+            path.extend(self.path(a, b, avoid_stairs)[1:])
+        cost = sum(self.distance(a, b, avoid_stairs) for a, b in zip(legs, legs[1:]))
+        uses_stairs = any((a, b) in self._stairs for a, b in zip(path, path[1:]))
+        return Route(path, order, cost, uses_stairs)
@@ -0,0 +1,156 @@
+"""Recurrence-rule dosing schedules.
+
+Each medication carries a compact ``DoseRule`` (times of day, day interval and
+the start/end of the course) instead of a materialized list of reminders.
+Occurrences are generated lazily for whatever window a page asks for.
+"""
+import heapq
+from datetime import datetime, time, timedelta
+
+# Standard TB regimen: 2-month intensive plus 4-month continuation phase
+REGIMEN_DAYS = 182
+
+# Dose offsets from the first daily dose, in minutes
+FREQUENCY_OFFSETS = {
+    'Once daily': (0,),
+    'Twice daily': (0, 12 * 60),
+    'Three times daily': (0, 5 * 60, 12 * 60),
+    'As needed': (),
+}
+
+DEFAULT_FIRST_DOSE = '09:00'
+
+
+class DoseRule:
+    """RRULE-style daily recurrence for one medication."""
+
+    __slots__ = ('medication', 'times', 'interval', 'start', 'end')
+
+    def __init__(self, medication, times, start, end=None, interval=1):
+        self.medication = medication
+        # Minutes after midnight, sorted and within a single day
+        self.times = tuple(sorted(minute % (24 * 60) for minute in times))
+        self.interval = interval
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def for_medication(cls, med, start, days=None):
+        """Build the rule implied by a medication's ``frequency``.
+
+        Doses are anchored at ``next_dose`` (HH:MM). With ``days`` the course
+        ends after that many days; otherwise it is open-ended.
+        """
+        hour, minute = map(int, (med.get('next_dose') or DEFAULT_FIRST_DOSE).split(':'))
+        first = hour * 60 + minute
+        offsets = FREQUENCY_OFFSETS.get(med['frequency'], (0,))
+        end = start + timedelta(days=days - 1) if days else None
+        return cls(med['name'], [first + offset for offset in offsets], start, end)
+
+    def occurrences(self, start, end):
+        """Yield dose datetimes in ``[start, end)`` in order."""
+        if not self.times:
+            return
+        day = max(start.date(), self.start)
+        misaligned = (day - self.start).days % self.interval
+        if misaligned:
+            day += timedelta(days=self.interval - misaligned)
+        last_day = end.date() if self.end is None else min(end.date(), self.end)
+        step = timedelta(days=self.interval)
+        while day <= last_day:
+            midnight = datetime.combine(day, time())
+            for minute in self.times:
+                when = midnight + timedelta(minutes=minute)
+                if start <= when < end:
+                    yield when
+            day += step
+
+    def next_after(self, now):
+        """First dose at or after ``now``, or ``None`` once the course is over."""
+        begin = max(now, datetime.combine(self.start, time()))
+        return next(self.occurrences(now, begin + timedelta(days=self.interval + 1)), None)
+
+
+class Schedule:
+    """Dose rules per medication merged with one-off reminders.
+
+    With ``base`` the schedule is an overlay: it starts out with the base's
+    rules and stores only the rules set or removed on top of them. The base's
+    own reminders are not included.
+    """
+
+    def __init__(self, reminders, base=None):
+        self.reminders = reminders
+        self.base = base
+        self._own_rules = {}
+        self._removed = set()
+        self._rules_version = 0
+
+    @property
+    def version(self):
+        """Changes whenever a rule or reminder is added or removed."""
+        return (self._rules_version, len(self.reminders))
+
+    @property
+    def rules(self):
+        """Medication name -> ``DoseRule``."""
+        if self.base is None:
+            return self._own_rules
+        rules = {name: rule for name, rule in self.base.rules.items() if name not in self._removed}
+        rules.update(self._own_rules)
+        return rules
+
+    @property
+    def diverged(self):
+        """False while an overlay still matches its base exactly."""
+        return self.base is None or bool(self._own_rules or self._removed or len(self.reminders))
+
+    def set_rule(self, rule):
+        self._own_rules[rule.medication] = rule
+        self._removed.discard(rule.medication)
+        self._rules_version += 1
+
+    def remove(self, medication):
+        removed = self._own_rules.pop(medication, None) is not None
+        if self.base is not None and medication in self.base.rules and medication not in self._removed:
+            self._removed.add(medication)
+            removed = True
+        if removed:
+            self._rules_version += 1
+
+    def _rule_doses(self, rule, start, end):
+        return ({'medication': rule.medication, 'datetime': when, 'note': f'Regular dose of {rule.medication}'}
+                for when in rule.occurrences(start, end))
+
+    def occurrences(self, start, end):
+        """Scheduled doses and reminders in ``[start, end)``, earliest first."""
+        streams = [self._rule_doses(rule, start, end) for rule in self.rules.values()]
+        streams.append(self.reminders.between(start, end))
+        return list(heapq.merge(*streams, key=lambda item: item['datetime']))
+
+    def on_day(self, day):
+        midnight = datetime.combine(day, time())
+        return self.occurrences(midnight, midnight + timedelta(days=1))
+
+    def scheduled_for(self, medication, when, window=timedelta(hours=12)):
+        """The medication's scheduled dose nearest to ``when`` within ``window``, or ``None``.
+
+        This is the occurrence a dose logged at ``when`` fulfills.
+        """
+        rule = self.rules.get(medication)
+        if rule is None:
+            return None
+        return min(rule.occurrences(when - window, when + window), key=lambda due: abs(due - when), default=None)
+
+    def next_due(self, now):
+        """The earliest dose or reminder due at or after ``now``, or ``None``."""
+        candidates = []
+        for rule in self.rules.values():
+            when = rule.next_after(now)
+            if when is not None:
+                candidates.append({'medication': rule.medication, 'datetime': when,
+                                   'note': f'Regular dose of {rule.medication}'})
+        reminder = self.reminders.next_due(now)
+        if reminder is not None:
+            candidates.append(reminder)
+        return min(candidates, key=lambda item: item['datetime'], default=None)
@@ -0,0 +1,226 @@
+"""Append-only, on-disk dose log backed by SQLite in WAL mode.
+
+The log is shared by every session of the app process. Rows are only ever
+inserted; triggers reject updates and deletes so the table stays a faithful
+history of what was recorded. ``taken_at`` and ``scheduled_at`` are epoch
+seconds (when the dose was taken and the scheduled occurrence it fulfills)
+and are NULL for doses logged without a time.
+
+Every dose belongs to a ``patient_id``. The app's own log only holds patient
+0; a clinic's cohort log holds every patient's doses in one table.
+"""
+import os
+import sqlite3
+import threading
+from datetime import date
+
+from medtracker import perf
+from medtracker.records import NO_TIME, STATUSES, DoseRecords, epoch_seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS doses (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    medication TEXT NOT NULL,
+    status TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT '',
+    taken_at INTEGER,
+    scheduled_at INTEGER,
+    patient_id INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS doses_by_date ON doses (date);
+CREATE INDEX IF NOT EXISTS doses_by_medication ON doses (medication, date);
+CREATE TRIGGER IF NOT EXISTS doses_no_update BEFORE UPDATE ON doses
+BEGIN
+    SELECT RAISE(ABORT, 'dose log is append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS doses_no_delete BEFORE DELETE ON doses
+BEGIN
+    SELECT RAISE(ABORT, 'dose log is append-only');
+END;
+"""
+
+# Columns added after the first release, created on logs that predate them
+_ADDED_COLUMNS = {
+    'taken_at': 'INTEGER',
+    'scheduled_at': 'INTEGER',
+    'patient_id': 'INTEGER NOT NULL DEFAULT 0',
+}
+
+
+def _time(when):
+    epoch = epoch_seconds(when)
+    return None if epoch == NO_TIME else epoch
+
+
+def _iso(day):
+    if isinstance(day, date):
+        return day.isoformat()
+    return str(day)
+
+
+def _where(date_range, medication, patient=None):
+    clauses, params = [], []
+    if date_range is not None:
+        start, end = date_range
+        if start is not None:
+            clauses.append('date >= ?')
+            params.append(_iso(start))
+        if end is not None:
+            clauses.append('date <= ?')
+            params.append(_iso(end))
+    if medication is not None:
+        clauses.append('medication = ?')
+        params.append(medication)
+    if patient is not None:
+        clauses.append('patient_id = ?')
+        params.append(patient)
+    if not clauses:
+        return '', params
+    return ' WHERE ' + ' AND '.join(clauses), params
+
+
+class DoseStore:
+    """Repository over the ``doses`` table.
+
+    ``date_range`` arguments are inclusive ``(start, end)`` pairs of dates or
+    ISO strings; either bound may be ``None`` to leave that side open.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._listeners = []
+        # Bumped on every committed append so derived caches can invalidate
+        self.version = 0
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(doses)')}
+        for name, kind in _ADDED_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f'ALTER TABLE doses ADD COLUMN {name} {kind}')
+        # Covers per-patient status counts, so cohort summaries never touch the table
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS doses_by_patient ON doses (patient_id, medication, status, date)')
+
+    def subscribe(self, listener, replay=False):
+        """Call ``listener(doses)`` with each batch of newly committed doses.
+
+        Batches are ``DoseRecords``. With ``replay`` the listener first
+        receives every dose already in the log, atomically with the
+        subscription. Listeners run while the store lock is held and must not
+        call back into the store.
+        """
+        with self._lock:
+            if replay:
+                listener(self._select('', []))
+            self._listeners.append(listener)
+
+    def replay(self, listener):
+        """Return ``listener(doses)`` over the whole log with appends held off."""
+        with self._lock:
+            return listener(self._select('', []))
+
+    def append_dose(self, medication, date, status, notes='', taken_at=None, scheduled_at=None, patient_id=0):
+        """Record a single dose.
+
+        ``taken_at`` and ``scheduled_at`` are naive local datetimes or epoch
+        seconds.
+        """
+        self.append_many([{'medication': medication, 'date': date, 'status': status, 'notes': notes,
+                           'taken_at': taken_at, 'scheduled_at': scheduled_at, 'patient_id': patient_id}])
+
+    def append_many(self, doses):
+        """Record several dose dicts in one transaction."""
+        rows = []
+        for dose in doses:
+            if dose['status'] not in STATUSES:
+                raise ValueError(f"Unknown dose status: {dose['status']!r}")
+            rows.append((dose['medication'], _iso(dose['date']), dose['status'], dose.get('notes') or '',
+                         _time(dose.get('taken_at')), _time(dose.get('scheduled_at')), dose.get('patient_id', 0)))
+        # Bulk loads into a log nobody follows skip building the batch
+        batch = DoseRecords.from_rows(rows) if self._listeners else None
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(
+                    'INSERT INTO doses (medication, date, status, notes, taken_at, scheduled_at, patient_id) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            self.version += 1
+            if self._listeners and batch is None:
+                batch = DoseRecords.from_rows(rows)
+            for listener in self._listeners:
+                listener(batch)
+
+    def scan(self, date_range=None, medication=None, patient=None):
+        """Return the doses inside ``date_range`` in logging order, as ``DoseRecords``."""
+        where, params = _where(date_range, medication, patient)
+        with self._lock:
+            return self._select(where, params)
+
+    def iter_batches(self, batch_rows, date_range=None, medication=None, patient=None):
+        """Yield the doses inside ``date_range`` in logging order, ``batch_rows`` at a time.
+
+        Reads through its own read-only connection, so a long export sees one
+        snapshot of the log and never holds off appends.
+        """
+        where, params = _where(date_range, medication, patient)
+        conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+        try:
+            cursor = conn.execute(
+                f'SELECT medication, date, status, notes, taken_at, scheduled_at, patient_id FROM doses{where} '
+                'ORDER BY date, id', params)
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                perf.count('dose_rows_scanned_total', len(rows))
+                yield DoseRecords.from_rows(rows)
+        finally:
+            conn.close()
+
+    def _select(self, where, params):
+        cursor = self._conn.execute(
+            f'SELECT medication, date, status, notes, taken_at, scheduled_at, patient_id FROM doses{where} '
+            'ORDER BY date, id', params)
+        records = DoseRecords.from_rows(cursor)
+        perf.count('dose_rows_scanned_total', len(records))
+        return records
+
+    def count_by_status(self, date_range=None, medication=None, patient=None):
+        """Return ``{status: count}`` for every status, including zeros."""
+        where, params = _where(date_range, medication, patient)
+        counts = dict.fromkeys(STATUSES, 0)
+        with self._lock:
+            for status, count in self._conn.execute(
+                    f'SELECT status, COUNT(*) FROM doses{where} GROUP BY status', params):
+                counts[status] = count
+        return counts
+
+    def patient_range(self):
+        """``(lowest, highest)`` patient id in the log, or ``None`` when it is empty."""
+        # Separate statements, so each is a single seek on the patient index
+        with self._lock:
+            low = self._conn.execute('SELECT MIN(patient_id) FROM doses').fetchone()[0]
+            high = self._conn.execute('SELECT MAX(patient_id) FROM doses').fetchone()[0]
+        return None if low is None else (low, high)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM doses').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
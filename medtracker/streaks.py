@@ -0,0 +1,221 @@
+"""Adherence streaks and missed-dose gaps over the dose log.
+
+Every medication (and all medications together) gets one state per day:
+no doses logged, kept (every dose taken, possibly late) or missed (at least
+one dose missed). Streaks and gaps are the runs of that array, found with a
+vectorized run-length encoding.
+
+A column also keeps a running summary of every run before its latest day, so
+logging a dose for the latest day or a later one is O(1). Only a backfill
+into earlier days re-encodes that medication's history.
+"""
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from medtracker.records import STATUSES, DoseRecords, day_iso
+
+# Per-day states, ordered so a day's state only ever rises
+NONE, KEPT, MISSED = 0, 1, 2
+STATE_LABELS = {NONE: 'No doses', KEPT: 'Kept', MISSED: 'Missed'}
+
+_MISSED_CODE = STATUSES.index('Missed')
+
+
+def run_lengths(states):
+    """``(values, starts, lengths)`` of the runs in a 1-D array."""
+    states = np.asarray(states)
+    if not len(states):
+        empty = np.zeros(0, dtype=np.int64)
+        return states[:0], empty, empty
+    starts = np.r_[0, np.flatnonzero(np.diff(states)) + 1]
+    lengths = np.diff(np.r_[starts, len(states)])
+    return states[starts], starts, lengths
+
+
+class _Column:
+    """Day states of one medication plus the runs before its last day."""
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.states = bytearray()
+        self._rebuild()
+
+    @property
+    def last_day(self):
+        return self.origin + len(self.states) - 1
+
+    def mark(self, day, state):
+        """Raise ``day`` to ``state``; O(1) unless ``day`` is before the last day."""
+        offset = day - self.origin
+        if 0 <= offset < len(self.states):
+            if state > self.states[offset]:
+                self.states[offset] = state
+                if offset < len(self.states) - 1:
+                    self._rebuild()
+            return
+        if offset < 0:
+            self.mark_many([day], [state])
+            return
+        # A later day closes the old last day and any empty days in between
+        if self.states:
+            self._fold(self.states[-1], 1)
+        empty = offset - len(self.states)
+        if empty:
+            self._fold(NONE, empty)
+        self.states.extend(bytes(empty + 1))
+        self.states[-1] = state
+
+    def mark_many(self, days, states):
+        """Raise several (sorted, unique) days at once, then re-encode."""
+        lo, hi = int(days[0]), int(days[-1])
+        if lo < self.origin:
+            self.states[0:0] = bytes(self.origin - lo)
+            self.origin = lo
+        if hi > self.last_day:
+            self.states.extend(bytes(hi - self.last_day))
+        column = np.frombuffer(self.states, dtype=np.int8)
+        offsets = np.asarray(days, dtype=np.int64) - self.origin
+        column[offsets] = np.maximum(column[offsets], states)
+        del column
+        self._rebuild()
+
+    def _fold(self, value, length):
+        if value == self.last_value:
+            self.last_len += length
+            return
+        self._close(self.last_value, self.last_len)
+        self.last_value, self.last_len = value, length
+
+    def _close(self, value, length):
+        if value == KEPT:
+            self.longest = max(self.longest, length)
+        elif value == MISSED:
+            self.gaps[length] += 1
+
+    def _rebuild(self):
+        values, _, lengths = run_lengths(np.frombuffer(self.states, dtype=np.int8)[:-1])
+        self.longest, self.gaps = 0, Counter()
+        self.last_value, self.last_len = NONE, 0
+        if len(values):
+            closed_values, closed_lengths = values[:-1], lengths[:-1]
+            self.longest = int(closed_lengths[closed_values == KEPT].max(initial=0))
+            self.gaps.update(closed_lengths[closed_values == MISSED].tolist())
+            self.last_value, self.last_len = int(values[-1]), int(lengths[-1])
+
+    def summary(self):
+        last = self.states[-1]
+        longest, gaps = self.longest, Counter(self.gaps)
+        if last == self.last_value:
+            run = self.last_len + 1
+        else:
+            if self.last_value == KEPT:
+                longest = max(longest, self.last_len)
+            elif self.last_value == MISSED:
+                gaps[self.last_len] += 1
+            run = 1
+        if last == KEPT:
+            longest = max(longest, run)
+        elif last == MISSED:
+            gaps[run] += 1
+        return {
+            'current_streak': run if last == KEPT else 0,
+            'current_misses': run if last == MISSED else 0,
+            'longest_streak': longest,
+            'gaps': gaps,
+            'longest_gap': max(gaps, default=0),
+            'last_day': date.fromisoformat(day_iso(self.last_day)),
+        }
+
+
+class StreakTracker:
+    """Streak and gap statistics per medication, kept current as doses arrive."""
+
+    def __init__(self, doses=()):
+        self._lock = threading.Lock()
+        # Medication name (``None`` for all medications) -> _Column
+        self._columns = {}
+        self.apply(doses)
+
+    def apply(self, doses):
+        """Fold a batch of ``DoseRecords`` or dose dicts into the day states."""
+        if not isinstance(doses, DoseRecords):
+            doses = DoseRecords(doses)
+        if not doses:
+            return
+        days = doses.days.astype(np.int64)
+        states = np.where(doses.status_codes == _MISSED_CODE, MISSED, KEPT).astype(np.int8)
+        with self._lock:
+            if len(doses.medications) == 1:
+                self._mark(doses.medications[0], days, states)
+            else:
+                codes = doses.medication_codes
+                for code, medication in enumerate(doses.medications):
+                    mask = codes == code
+                    self._mark(medication, days[mask], states[mask])
+            self._mark(None, days, states)
+
+    def _mark(self, key, days, states):
+        if not len(days):
+            return
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = _Column(int(days.min()))
+        if len(days) == 1:
+            column.mark(int(days[0]), int(states[0]))
+            return
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        day_states = np.zeros(len(unique_days), dtype=np.int8)
+        np.maximum.at(day_states, inverse, states)
+        column.mark_many(unique_days, day_states)
+
+    @property
+    def medications(self):
+        with self._lock:
+            return [key for key in self._columns if key is not None]
+
+    def summary(self, medication=None, today=None):
+        """Current/longest streak, current consecutive misses and gap lengths.
+
+        ``gaps`` maps a gap length in days to how often it occurred. With
+        ``today``, a history whose last logged day is before yesterday has no
+        current streak or misses.
+        """
+        with self._lock:
+            column = self._columns.get(medication)
+            if column is None:
+                return {'current_streak': 0, 'current_misses': 0, 'longest_streak': 0, 'gaps': Counter(),
+                        'longest_gap': 0, 'last_day': None}
+            summary = column.summary()
+        if today is not None and summary['last_day'] < today - timedelta(days=1):
+            summary['current_streak'] = summary['current_misses'] = 0
+        return summary
+
+    def alerts(self, min_misses=2, today=None):
+        """``{medication: consecutive missed days}`` at or above ``min_misses``."""
+        alerts = {}
+        for medication in self.medications:
+            misses = self.summary(medication, today)['current_misses']
+            if misses >= min_misses:
+                alerts[medication] = misses
+        return alerts
+
+    def runs(self, medication=None):
+        """Every run of a medication's history as a frame, oldest first."""
+        with self._lock:
+            column = self._columns.get(medication)
+            if column is None:
+                return pd.DataFrame(columns=['start', 'end', 'state', 'days'])
+            states = np.frombuffer(bytes(column.states), dtype=np.int8)
+            origin = column.origin
+        values, starts, lengths = run_lengths(states)
+        start = (starts + origin).astype('datetime64[D]')
+        return pd.DataFrame({
+            'start': start,
+            'end': start + (lengths - 1).astype('timedelta64[D]'),
+            'state': [STATE_LABELS[value] for value in values.tolist()],
+            'days': lengths,
+        })
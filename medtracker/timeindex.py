@@ -0,0 +1,185 @@
+"""Day-bucketed prefix sums of dose outcomes.
+
+``DayIndex`` keeps a cumulative ``(day, medication, status)`` count array so
+the totals for any ``[start, end]`` date range are a single subtraction, no
+matter how many years of history the log holds. Appends for the latest day
+only touch the tail of the array.
+"""
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from medtracker.records import STATUSES, DoseRecords
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _epoch_day(day):
+    """Days since 1970-01-01 for a date or ISO string."""
+    return int(np.datetime64(day, 'D').astype(np.int64))
+
+
+class DayIndex:
+    """Prefix-sum index over the dose log.
+
+    ``_cum[i]`` holds the counts of all doses logged before day ``origin + i``,
+    shaped ``(medication, status)``.
+    """
+
+    def __init__(self, doses=()):
+        self._lock = threading.Lock()
+        self.medications = []
+        self._codes = {}
+        self.origin = None
+        self._n_days = 0
+        self._daily = np.zeros((0, 0, len(STATUSES)), dtype=np.int32)
+        self._cum = np.zeros((1, 0, len(STATUSES)), dtype=np.int64)
+        self.apply(doses)
+
+    def apply(self, doses):
+        """Add a batch of ``DoseRecords`` or dose dicts, recomputing only the affected suffix."""
+        if not isinstance(doses, DoseRecords):
+            doses = DoseRecords(doses)
+        if not doses:
+            return
+        days = doses.days.astype(np.int64)
+        statuses = doses.status_codes.astype(np.intp)
+        with self._lock:
+            # Map the batch's medication codes onto this index's own
+            codes = np.array([self._code(medication) for medication in doses.medications], dtype=np.intp)
+            meds = codes[doses.medication_codes]
+            old_days = self._reserve(int(days.min()), int(days.max()))
+            offsets = days - self.origin
+            np.add.at(self._daily, (offsets, meds, statuses), 1)
+            first = min(int(offsets.min()), old_days)
+            end = self._n_days
+            self._cum[first + 1:end + 1] = self._cum[first] + np.cumsum(self._daily[first:end], axis=0)
+
+    def _code(self, medication):
+        code = self._codes.get(medication)
+        if code is None:
+            code = self._codes[medication] = len(self.medications)
+            self.medications.append(medication)
+        return code
+
+    def _reserve(self, lo, hi):
+        """Make room for days ``lo..hi`` and every known medication.
+
+        Returns the number of days whose prefix sums are still valid.
+        """
+        if self.origin is None:
+            self.origin = lo
+        origin = min(self.origin, lo)
+        n_days = max(self.origin + self._n_days, hi + 1) - origin
+        n_meds = len(self.medications)
+        day_cap, med_cap = self._daily.shape[:2]
+        if origin == self.origin and n_days <= day_cap and n_meds <= med_cap:
+            valid = self._n_days
+            self._n_days = n_days
+            return valid
+
+        shift = self.origin - origin
+        daily = np.zeros((max(n_days, 2 * day_cap), max(n_meds, 2 * med_cap), len(STATUSES)), dtype=np.int32)
+        daily[shift:shift + self._n_days, :med_cap] = self._daily[:self._n_days]
+        cum = np.zeros((daily.shape[0] + 1,) + daily.shape[1:], dtype=np.int64)
+        self._daily, self._cum = daily, cum
+        self.origin, self._n_days = origin, n_days
+        return 0
+
+    @property
+    def first_day(self):
+        return None if self.origin is None else np.datetime64(self.origin, 'D').astype(date)
+
+    @property
+    def last_day(self):
+        return None if self.origin is None else np.datetime64(self.origin + self._n_days - 1, 'D').astype(date)
+
+    def _span(self, start, end):
+        """Clamp an inclusive date range to array offsets ``[lo, hi)``."""
+        lo = min(max(_epoch_day(start) - self.origin, 0), self._n_days)
+        hi = min(_epoch_day(end) - self.origin + 1, self._n_days)
+        return lo, max(hi, lo)
+
+    def _columns(self, medication):
+        if medication is None:
+            return slice(0, len(self.medications))
+        code = self._codes.get(medication)
+        return slice(code, code + 1) if code is not None else slice(0, 0)
+
+    def counts(self, start, end, medication=None):
+        """``[Taken, Missed, Delayed]`` counts for the range, in O(1)."""
+        with self._lock:
+            if self.origin is None:
+                return np.zeros(len(STATUSES), dtype=np.int64)
+            lo, hi = self._span(start, end)
+            cols = self._columns(medication)
+            return (self._cum[hi, cols] - self._cum[lo, cols]).sum(axis=0)
+
+    def adherence(self, start, end, medication=None):
+        """Percentage of doses taken in the range, or ``None`` without doses."""
+        counts = self.counts(start, end, medication)
+        total = counts.sum()
+        return counts[_STATUS_CODES['Taken']] / total * 100 if total else None
+
+    def daily(self, start, end, medication=None):
+        """Per-day status counts and ``adherence_rate`` for days with doses."""
+        with self._lock:
+            if self.origin is None:
+                return pd.DataFrame(columns=list(STATUSES) + ['adherence_rate'])
+            lo, hi = self._span(start, end)
+            counts = self._daily[lo:hi, self._columns(medication)].sum(axis=1)
+            origin = self.origin
+        logged = counts.sum(axis=1) > 0
+        dates = (np.arange(lo, hi) + origin).astype('datetime64[D]')[logged]
+        frame = pd.DataFrame(counts[logged], index=pd.DatetimeIndex(dates, name='date'), columns=list(STATUSES))
+        frame['adherence_rate'] = frame['Taken'] / frame[list(STATUSES)].sum(axis=1) * 100
+        return frame
+
+    def by_medication(self, start, end):
+        """Status percentages per medication over the range."""
+        with self._lock:
+            if self.origin is None:
+                return pd.DataFrame(columns=list(STATUSES))
+            lo, hi = self._span(start, end)
+            counts = self._cum[hi, :len(self.medications)] - self._cum[lo, :len(self.medications)]
+            medications = list(self.medications)
+        frame = pd.DataFrame(counts, index=pd.Index(medications, name='medication'), columns=list(STATUSES))
+        frame = frame[frame.sum(axis=1) > 0]
+        return frame.div(frame.sum(axis=1), axis=0) * 100
+
+    def medication_counts(self, start, end, medications):
+        """Status counts over the range for each name in ``medications``, in order.
+
+        Medications that were never logged get zeros.
+        """
+        counts = np.zeros((len(medications), len(STATUSES)), dtype=np.int64)
+        with self._lock:
+            if self.origin is None:
+                return counts
+            lo, hi = self._span(start, end)
+            codes = np.array([self._codes.get(medication, -1) for medication in medications], dtype=np.intp)
+            known = codes >= 0
+            counts[known] = self._cum[hi, codes[known]] - self._cum[lo, codes[known]]
+        return counts
+
+    def rolling(self, start, end, window, medication=None):
+        """Trailing ``window``-day adherence for every day in the range.
+
+        Days whose window holds no doses are NaN.
+        """
+        with self._lock:
+            if self.origin is None:
+                return pd.Series(dtype=float)
+            lo, hi = self._span(start, end)
+            base = max(lo + 1 - window, 0)
+            cum = self._cum[base:hi + 1, self._columns(medication)].sum(axis=1)
+            origin = self.origin
+        ends = np.arange(lo + 1, hi + 1)
+        window_counts = cum[ends - base] - cum[np.maximum(ends - window, 0) - base]
+        totals = window_counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates = np.where(totals > 0, window_counts[:, _STATUS_CODES['Taken']] / totals * 100, np.nan)
+        dates = (np.arange(lo, hi) + origin).astype('datetime64[D]')
+        return pd.Series(rates, index=pd.DatetimeIndex(dates, name='date'), name=f'{window}-day')
@@ -0,0 +1,117 @@
+"""Dose timing: how far from the scheduled time doses are actually taken.
+
+``TimingIndex`` keeps the taken and scheduled epoch seconds of every dose
+that is linked to a scheduled occurrence, appended as doses arrive. The
+lateness histogram, on-time shares and per-medication delay percentiles are
+computed over the whole log in one vectorized pass (a single sort groups the
+delays by medication) and reused until the next dose is logged.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from medtracker.records import NO_TIME, DoseRecords
+
+# Lateness histogram edges in minutes; earlier or later doses land in the end bins
+DELAY_BINS = np.arange(-60, 241, 15)
+# Minutes either side of the scheduled time that still count as on time
+ON_TIME_WINDOWS = (15, 30, 60)
+PERCENTILES = (50, 90, 95)
+
+
+def delay_percentiles(codes, delays, n_groups, percentiles=PERCENTILES):
+    """``(n_groups, len(percentiles))`` delay percentiles per group code.
+
+    Matches ``np.percentile``'s linear interpolation; groups without delays
+    are NaN.
+    """
+    order = np.lexsort((delays, codes))
+    codes, delays = codes[order], delays[order]
+    sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    # Fractional rank of each percentile inside each group's sorted slice
+    rank = (sizes[:, None] - 1) * (np.asarray(percentiles, dtype=float)[None, :] / 100)
+    lo = np.floor(rank).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(sizes[:, None] - 1, 0))
+    result = np.full(rank.shape, np.nan)
+    present = sizes > 0
+    if present.any():
+        base = starts[present, None]
+        low, high = delays[base + lo[present]], delays[base + hi[present]]
+        result[present] = low + (high - low) * (rank[present] - lo[present])
+    return result
+
+
+def summarize(medication_codes, medications, delays):
+    """Timing statistics for delays in minutes (positive is late).
+
+    Returns ``{'count', 'histogram', 'on_time', 'by_medication'}``:
+    ``histogram`` counts doses per ``DELAY_BINS`` bucket, ``on_time`` maps each
+    of ``ON_TIME_WINDOWS`` to the percentage of doses within it and
+    ``by_medication`` is a frame of dose counts, mean delay, percentiles and
+    on-time percentages per medication.
+    """
+    n_meds = len(medications)
+    codes = np.asarray(medication_codes, dtype=np.intp)
+    delays = np.asarray(delays, dtype=float)
+    counts, _ = np.histogram(np.clip(delays, DELAY_BINS[0], DELAY_BINS[-1]), bins=DELAY_BINS)
+    histogram = pd.Series(counts, index=pd.Index(DELAY_BINS[:-1], name='minutes_late'))
+
+    within = np.abs(delays)[:, None] <= np.array(ON_TIME_WINDOWS)[None, :]
+    on_time = dict.fromkeys(ON_TIME_WINDOWS, 0.0)
+    if len(delays):
+        on_time.update(zip(ON_TIME_WINDOWS, (within.mean(axis=0) * 100).tolist()))
+    doses = np.bincount(codes, minlength=n_meds)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_delay = np.bincount(codes, weights=delays, minlength=n_meds) / doses
+        within_by_med = np.stack([np.bincount(codes, weights=within[:, i], minlength=n_meds)
+                                  for i in range(len(ON_TIME_WINDOWS))], axis=1) / doses[:, None] * 100
+
+    by_medication = pd.DataFrame({'doses': doses, 'mean_delay': mean_delay},
+                                 index=pd.Index(medications, name='medication'))
+    percentiles = delay_percentiles(codes, delays, n_meds)
+    for i, q in enumerate(PERCENTILES):
+        by_medication[f'p{q}'] = percentiles[:, i]
+    for i, window in enumerate(ON_TIME_WINDOWS):
+        by_medication[f'within_{window}'] = within_by_med[:, i]
+    return {
+        'count': len(delays),
+        'histogram': histogram,
+        'on_time': on_time,
+        'by_medication': by_medication[by_medication['doses'] > 0],
+    }
+
+
+class TimingIndex:
+    """Taken and scheduled times of every linked dose, kept current as doses arrive."""
+
+    def __init__(self, doses=()):
+        self._lock = threading.Lock()
+        self._records = DoseRecords()
+        self._summary = None
+        self.apply(doses)
+
+    def apply(self, doses):
+        """Keep the doses of a batch that were taken and linked to a scheduled occurrence."""
+        if not isinstance(doses, DoseRecords):
+            doses = DoseRecords(doses)
+        timed = (doses.taken_at != NO_TIME) & (doses.scheduled_at != NO_TIME)
+        if not timed.any():
+            return
+        with self._lock:
+            self._records.extend(doses.select(timed))
+            self._summary = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._records)
+
+    def summary(self):
+        """``summarize`` over every timed dose in the log, cached until the next append."""
+        with self._lock:
+            if self._summary is None:
+                records = self._records
+                delays = (records.taken_at - records.scheduled_at) / 60
+                self._summary = summarize(records.medication_codes, records.medications, delays)
+            return self._summary
@@ -0,0 +1,242 @@
+"""Bulk import and export of the dose log as CSV or Parquet.
+
+Both directions stream. Imports are read ``CHUNK_ROWS`` rows at a time,
+validated (dates, the status vocabulary and, when given, the known medication
+names) and appended one transaction per chunk; rows that fail validation are
+skipped and reported. Exports read the log through ``DoseStore.iter_batches``
+and write each batch as its own Parquet row group or block of CSV lines, so
+neither direction ever holds a whole file in memory.
+
+Files carry the columns in ``COLUMNS``; only ``date``, ``medication`` and
+``status`` are required. Exported times are UTC. Imported times may be epoch
+seconds, ISO datetimes with an offset, or naive ISO datetimes in local time.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from medtracker import perf
+from medtracker.records import NO_TIME, STATUSES, local_epochs
+
+COLUMNS = ('date', 'medication', 'status', 'notes', 'taken_at', 'scheduled_at', 'patient_id')
+REQUIRED = ('date', 'medication', 'status')
+FORMATS = ('csv', 'parquet')
+# Rows read, validated and appended (or exported) at a time
+CHUNK_ROWS = 50_000
+# Rejected rows listed in an import report; the rest are only counted
+MAX_ERRORS = 100
+
+SCHEMA = pa.schema([
+    ('date', pa.date32()),
+    ('medication', pa.string()),
+    ('status', pa.string()),
+    ('notes', pa.string()),
+    ('taken_at', pa.timestamp('s', tz='UTC')),
+    ('scheduled_at', pa.timestamp('s', tz='UTC')),
+    ('patient_id', pa.int32()),
+])
+
+_OFFSET = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
+
+def file_format(name):
+    """``'csv'`` or ``'parquet'`` from a file name's extension."""
+    extension = os.path.splitext(name)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    if extension == '.csv':
+        return 'csv'
+    raise ValueError(f'Unsupported dose log file: {name!r} (expected .csv or .parquet)')
+
+
+def _csv_chunks(source, chunk_rows):
+    # Every column as text, so one bad value can't change a chunk's dtypes
+    with pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False,
+                     usecols=lambda column: column in COLUMNS) as reader:
+        yield from reader
+
+
+def _parquet_chunks(source, chunk_rows):
+    parquet = pq.ParquetFile(source)
+    columns = [column for column in COLUMNS if column in parquet.schema_arrow.names]
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def _text(values):
+    return values.fillna('').astype(str).str.strip()
+
+
+def _days(values):
+    """Day numbers for a column of dates, and the mask of unparseable ones."""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values.where(values != ''), errors='coerce', format='ISO8601')
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_localize(None)
+    bad = values.isna().to_numpy()
+    days = values.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    return np.where(bad, 0, days).astype(np.int32), bad
+
+
+def _utc_seconds(moments):
+    # Whatever unit pandas parsed to, as epoch seconds
+    return moments.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+
+def _epochs(values):
+    """Epoch seconds for a column of times (``NO_TIME`` where blank), and the mask of unparseable ones."""
+    epochs = np.full(len(values), NO_TIME, dtype=np.int64)
+    bad = np.zeros(len(values), dtype=bool)
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        timed = values.notna().to_numpy()
+        epochs[timed] = _utc_seconds(values[timed])
+    elif pd.api.types.is_datetime64_dtype(values):
+        timed = values.notna().to_numpy()
+        epochs[timed] = local_epochs(values[timed].to_numpy())
+    elif pd.api.types.is_numeric_dtype(values):
+        timed = values.notna().to_numpy()
+        epochs[timed] = values[timed].astype(np.int64)
+    else:
+        text = _text(values)
+        numbers = pd.to_numeric(text, errors='coerce')
+        numeric = numbers.notna().to_numpy()
+        epochs[numeric] = numbers[numeric].astype(np.int64)
+        moments = (text != '').to_numpy() & ~numeric
+        aware = moments & text.str.contains(_OFFSET).to_numpy()
+        naive = moments & ~aware
+        if aware.any():
+            parsed = pd.to_datetime(text[aware], errors='coerce', utc=True, format='ISO8601')
+            ok = parsed.notna().to_numpy()
+            epochs[np.flatnonzero(aware)[ok]] = _utc_seconds(parsed[ok])
+            bad[np.flatnonzero(aware)[~ok]] = True
+        if naive.any():
+            parsed = pd.to_datetime(text[naive], errors='coerce', format='ISO8601')
+            ok = parsed.notna().to_numpy()
+            epochs[np.flatnonzero(naive)[ok]] = local_epochs(parsed[ok].to_numpy())
+            bad[np.flatnonzero(naive)[~ok]] = True
+    return epochs, bad
+
+
+def _validate(chunk, medications, patient):
+    """Dose dicts for the valid rows of ``chunk``, and ``(position, reason)`` for the rest."""
+    chunk = chunk.reset_index(drop=True)
+    reasons = np.full(len(chunk), None, dtype=object)
+
+    def reject(bad, reason):
+        # Each row keeps the first reason it fails on
+        fresh = np.asarray(bad) & pd.isna(reasons)
+        reasons[fresh] = reason if isinstance(reason, str) else np.asarray(reason, dtype=object)[fresh]
+
+    days, bad_days = _days(chunk['date'])
+    reject(bad_days, 'invalid date')
+    medication = _text(chunk['medication'])
+    reject((medication == '').to_numpy(), 'missing medication')
+    if medications is not None:
+        reject(~medication.isin(medications).to_numpy(), ('unknown medication ' + medication.map(repr)).to_numpy())
+    status = _text(chunk['status'])
+    reject(~status.isin(STATUSES).to_numpy(), ('unknown status ' + status.map(repr)).to_numpy())
+    times = {}
+    for column in ('taken_at', 'scheduled_at'):
+        if column in chunk:
+            times[column], bad_times = _epochs(chunk[column])
+            reject(bad_times, f'invalid {column}')
+        else:
+            times[column] = np.full(len(chunk), NO_TIME, dtype=np.int64)
+    if patient is not None or 'patient_id' not in chunk:
+        patients = np.full(len(chunk), patient or 0, dtype=np.int64)
+    else:
+        numbers = pd.to_numeric(chunk['patient_id'].replace('', 0), errors='coerce')
+        bad_patients = (numbers.isna() | (numbers < 0) | (numbers % 1 != 0)).to_numpy()
+        reject(bad_patients, 'invalid patient_id')
+        patients = numbers.fillna(0).to_numpy().astype(np.int64)
+    notes = _text(chunk['notes']) if 'notes' in chunk else pd.Series('', index=chunk.index)
+
+    valid = pd.isna(reasons)
+    iso_dates = np.datetime_as_string(days[valid].astype('datetime64[D]'))
+    doses = [
+        {'medication': med, 'date': day, 'status': stat, 'notes': note,
+         'taken_at': None if taken == NO_TIME else taken,
+         'scheduled_at': None if scheduled == NO_TIME else scheduled, 'patient_id': patient_id}
+        for med, day, stat, note, taken, scheduled, patient_id in zip(
+            medication[valid].tolist(), iso_dates.tolist(), status[valid].tolist(), notes[valid].tolist(),
+            times['taken_at'][valid].tolist(), times['scheduled_at'][valid].tolist(), patients[valid].tolist())
+    ]
+    rejected = np.flatnonzero(~valid)
+    return doses, list(zip(rejected.tolist(), reasons[rejected].tolist()))
+
+
+def import_doses(source, store, fmt, medications=None, patient=None, chunk_rows=CHUNK_ROWS):
+    """Append the doses in a CSV or Parquet file to ``store``, chunk by chunk.
+
+    ``source`` is a path or binary file object. Rows naming a medication
+    outside ``medications`` (when given), an unknown status or an unreadable
+    date or time are skipped. ``patient`` assigns every row to one patient,
+    overriding any ``patient_id`` column. Returns ``{'rows', 'imported',
+    'rejected', 'errors'}``, where ``errors`` lists the first ``MAX_ERRORS``
+    rejected rows as ``(row, reason)`` with rows numbered from 1.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown dose log format: {fmt!r}')
+    chunks = _csv_chunks(source, chunk_rows) if fmt == 'csv' else _parquet_chunks(source, chunk_rows)
+    known = None if medications is None else set(medications)
+    report = {'rows': 0, 'imported': 0, 'rejected': 0, 'errors': []}
+    for chunk in chunks:
+        missing = [column for column in REQUIRED if column not in chunk]
+        if missing:
+            raise ValueError(f"Dose log file is missing column(s): {', '.join(missing)}")
+        with perf.span('transfer.import_chunk'):
+            doses, errors = _validate(chunk, known, patient)
+            if doses:
+                store.append_many(doses)
+        first_row = report['rows'] + 1
+        report['rows'] += len(chunk)
+        report['imported'] += len(doses)
+        report['rejected'] += len(errors)
+        room = MAX_ERRORS - len(report['errors'])
+        report['errors'].extend((first_row + position, reason) for position, reason in errors[:max(room, 0)])
+    perf.count('dose_rows_imported_total', report['imported'])
+    return report
+
+
+def _table(records):
+    """An Arrow table in ``SCHEMA`` for a batch of ``DoseRecords``."""
+    names = np.array(records.medications, dtype=object)
+
+    def times(epochs):
+        return pa.array(epochs, type=pa.int64(), mask=epochs == NO_TIME).cast(SCHEMA.field('taken_at').type)
+
+    return pa.Table.from_arrays([
+        pa.array(records.days, type=pa.int32()).cast(pa.date32()),
+        pa.array(names[records.medication_codes], type=pa.string()),
+        pa.array(np.array(STATUSES, dtype=object)[records.status_codes], type=pa.string()),
+        pa.array(records.notes, type=pa.string()),
+        times(records.taken_at),
+        times(records.scheduled_at),
+        pa.array(records.patient_ids, type=pa.int32()),
+    ], schema=SCHEMA)
+
+
+def export_doses(store, target, fmt, date_range=None, patient=None, chunk_rows=CHUNK_ROWS):
+    """Write the doses inside ``date_range`` to ``target`` as CSV or Parquet.
+
+    ``target`` is a path or binary file object. Each batch of ``chunk_rows``
+    doses becomes one Parquet row group or block of CSV lines. Returns the
+    number of doses written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown dose log format: {fmt!r}')
+    writer = pa_csv.CSVWriter(target, SCHEMA) if fmt == 'csv' else pq.ParquetWriter(target, SCHEMA)
+    written = 0
+    try:
+        for records in store.iter_batches(chunk_rows, date_range=date_range, patient=patient):
+            with perf.span('transfer.export_chunk'):
+                writer.write_table(_table(records))
+            written += len(records)
+    finally:
+        writer.close()
+    perf.count('dose_rows_exported_total', written)
+    return written
@@ -0,0 +1,24 @@
+"""One module per app page, imported the first time the page is shown.
+
+Each page module exposes ``render()`` and imports its own heavy dependencies
+(plotly for Analytics, the calendar component for Schedule), so a process only
+loads what its sessions actually visit.
+"""
+from importlib import import_module
+
+# Page label -> module in this package
+PAGES = {
+    "Dashboard": 'dashboard',
+    "Analytics": 'analytics',
+    "Personal Info": 'personal_info',
+    "Medications": 'medications',
+    "Schedule": 'schedule',
+    "Drone Service": 'drone',
+    "Clinic": 'clinic',
+    "Diagnostics": 'diagnostics',
+}
+
+
+def render(page):
+    """Draw ``page``, importing its module on first use."""
+    import_module(f'{__name__}.{PAGES[page]}').render()
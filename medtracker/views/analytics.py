@@ -0,0 +1,273 @@
+"""Analytics page: adherence trends, time of day, dose timing and per-medication charts.
+
+Every chart is serialized once per dose-log version and period through the
+shared figure cache, and time series are downsampled to ``MAX_POINTS``.
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from medtracker import perf
+from medtracker.analytics import PERIODS
+from medtracker.charts import downsample
+from medtracker.resources import (get_analytics_cache, get_day_index, get_dose_store, get_figure_cache,
+                                  get_streaks, get_timing)
+from medtracker.timing import ON_TIME_WINDOWS, PERCENTILES
+from medtracker.views.widgets import figure_chart
+
+
+def _adherence_trend(daily_adherence):
+    adherence_rate = downsample(daily_adherence['adherence_rate'])
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=adherence_rate.index,
+        y=adherence_rate.values,
+        mode='lines+markers',
+        name='Adherence Rate',
+        line=dict(color='#2ecc71', width=2),
+        fill='tozeroy'
+    ))
+    fig.update_layout(
+        title='Daily Medication Adherence',
+        xaxis_title='Date',
+        yaxis_title='Adherence Rate (%)',
+        hovermode='x unified',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig
+
+
+def _rolling_adherence(day_index, range_start, range_end):
+    fig_rolling = go.Figure()
+    for window, color in ((7, '#3498db'), (30, '#9b59b6')):
+        rolling_adherence = downsample(day_index.rolling(range_start, range_end, window))
+        fig_rolling.add_trace(go.Scatter(
+            x=rolling_adherence.index,
+            y=rolling_adherence.values,
+            mode='lines',
+            name=f'{window}-Day Average',
+            line=dict(color=color, width=2)
+        ))
+    fig_rolling.update_layout(
+        title='Rolling Adherence',
+        xaxis_title='Date',
+        yaxis_title='Adherence Rate (%)',
+        hovermode='x unified',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_rolling
+
+
+def _time_of_day(hourly_doses):
+    fig_time = go.Figure(data=[
+        go.Bar(
+            x=hourly_doses.index,
+            y=hourly_doses.values,
+            marker_color='#3498db'
+        )
+    ])
+    fig_time.update_layout(
+        title='Preferred Medication Times',
+        xaxis_title='Hour of Day',
+        yaxis_title='Number of Doses',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_time
+
+
+def _lateness(lateness):
+    fig_lateness = go.Figure(data=[
+        go.Bar(
+            x=lateness.index,
+            y=lateness.values,
+            marker_color=['#2ecc71' if abs(minutes) < ON_TIME_WINDOWS[0] else '#f1c40f'
+                          for minutes in lateness.index],
+        )
+    ])
+    fig_lateness.update_layout(
+        title='Minutes From Scheduled Time',
+        xaxis_title='Minutes Late (negative is early)',
+        yaxis_title='Number of Doses',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_lateness
+
+
+def _medication_adherence(med_adherence_pct):
+    fig_med = go.Figure()
+    for status in ['Taken', 'Delayed', 'Missed']:
+        fig_med.add_trace(go.Bar(
+            name=status,
+            x=med_adherence_pct.index,
+            y=med_adherence_pct[status],
+            marker_color='#2ecc71' if status == 'Taken'
+                       else '#f1c40f' if status == 'Delayed'
+                       else '#e74c3c'
+        ))
+    
+    fig_med.update_layout(
+        barmode='stack',
+        title='Medication-wise Adherence',
+        yaxis_title='Percentage',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_med
+
+
+def _gap_lengths(gap_lengths):
+    fig_gaps = go.Figure(data=[
+        go.Bar(
+            x=sorted(gap_lengths),
+            y=[gap_lengths[length] for length in sorted(gap_lengths)],
+            marker_color='#e74c3c'
+        )
+    ])
+    fig_gaps.update_layout(
+        title='Missed-Dose Gap Lengths',
+        xaxis_title='Consecutive Days Missed',
+        yaxis_title='Number of Gaps',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_gaps
+
+
+def render():
+    analytics_cache = get_analytics_cache()
+    day_index = get_day_index()
+    streaks = get_streaks()
+    timing = get_timing()
+    figures = get_figure_cache()
+
+    st.title("📈 Advanced Analytics")
+    
+    # Time period selector with tabs
+    time_period = st.radio("Select Time Period", list(PERIODS) + ["Custom Range"], horizontal=True)
+    today = datetime.now().date()
+    
+    if time_period == "Custom Range":
+        # Arbitrary ranges are answered from the prefix-sum day index
+        first_day = day_index.first_day or today
+        picked_range = st.date_input(
+            "Date Range",
+            value=(max(first_day, today - timedelta(days=90)), today),
+            min_value=first_day,
+            max_value=today
+        )
+        if len(picked_range) != 2:
+            st.info("Select an end date to complete the range.")
+            st.stop()
+        range_start, range_end = picked_range
+        period_stats = {
+            'daily': day_index.daily(range_start, range_end),
+            'by_medication': day_index.by_medication(range_start, range_end),
+        }
+    else:
+        range_start, range_end = today - timedelta(days=PERIODS[time_period] - 1), today
+        # Aggregates are materialized once per dose-log version
+        period_stats = analytics_cache.aggregates(time_period)
+    daily_adherence = period_stats['daily']
+    # Charts are rebuilt only when the log or the period shown changes
+    version = get_dose_store().version
+    period_key = (version, range_start, range_end)
+    
+    if not daily_adherence.empty:
+        period_adherence = day_index.adherence(range_start, range_end)
+        # None when the range only holds doses that don't count, e.g. future-dated ones
+        st.metric("Adherence for Period", "N/A" if period_adherence is None else f"{period_adherence:.1f}%")
+        
+        # Analytics Sections
+        tab1, tab2 = st.tabs(["Adherence Analytics", "Medication Insights"])
+        
+        with tab1:
+            # Adherence Trend
+            st.markdown("### 📈 Adherence Trend")
+            with perf.span('plotly.adherence_trend'):
+                figure_chart(figures.get(('adherence_trend',) + period_key,
+                                         lambda: _adherence_trend(daily_adherence)))
+            
+            # Rolling Adherence
+            st.markdown("### 📉 Rolling Adherence")
+            with perf.span('plotly.rolling_adherence'):
+                figure_chart(figures.get(('rolling_adherence',) + period_key,
+                                         lambda: _rolling_adherence(day_index, range_start, range_end)))
+            
+            # Time of Day Analysis
+            st.markdown("### ⏰ Time of Day Analysis")
+            hourly_doses = period_stats.get('hourly')
+            if time_period == "Custom Range":
+                st.info("Time of day analysis is available for the preset periods.")
+            elif hourly_doses is not None:
+                if not hourly_doses.empty:
+                    with perf.span('plotly.time_of_day'):
+                        figure_chart(figures.get(('time_of_day',) + period_key,
+                                                 lambda: _time_of_day(hourly_doses)))
+                else:
+                    st.info("No taken doses recorded yet.")
+            else:
+                st.warning("Time information is not available for analysis.")
+            
+            # Lateness against the schedule, over the whole history
+            st.markdown("### ⏱️ Dose Timing")
+            timing_stats = timing.summary()
+            if timing_stats['count']:
+                window_cols = st.columns(len(ON_TIME_WINDOWS))
+                for col, window in zip(window_cols, ON_TIME_WINDOWS):
+                    col.metric(f"Within ±{window} min", f"{timing_stats['on_time'][window]:.1f}%")
+                with perf.span('plotly.lateness'):
+                    figure_chart(figures.get(('lateness', version),
+                                             lambda: _lateness(timing_stats['histogram'])))
+                delays = timing_stats['by_medication'].round(1).rename(columns={
+                    'doses': 'Doses',
+                    'mean_delay': 'Mean Delay (min)',
+                    **{f'p{q}': f'P{q} Delay (min)' for q in PERCENTILES},
+                    **{f'within_{window}': f'Within ±{window} min (%)' for window in ON_TIME_WINDOWS},
+                })
+                st.dataframe(delays, use_container_width=True)
+            else:
+                st.info("No doses have been logged against a scheduled time yet.")
+        
+        with tab2:
+            # Medication-specific insights
+            st.markdown("### 💊 Medication Insights")
+            
+            # Medication adherence comparison
+            med_adherence_pct = period_stats['by_medication']
+            if not med_adherence_pct.empty:
+                with perf.span('plotly.medication_adherence'):
+                    figure_chart(figures.get(('medication_adherence',) + period_key,
+                                             lambda: _medication_adherence(med_adherence_pct)))
+            else:
+                st.info("No medication adherence data available yet.")
+            
+            # Streaks and gaps per medication, over the whole history
+            st.markdown("### 🔥 Streaks and Gaps")
+            streak_rows = []
+            for medication in sorted(streaks.medications):
+                summary = streaks.summary(medication, today=today)
+                streak_rows.append({
+                    'Medication': medication,
+                    'Current Streak': summary['current_streak'],
+                    'Longest Streak': summary['longest_streak'],
+                    'Missed Now': summary['current_misses'],
+                    'Gaps': sum(summary['gaps'].values()),
+                    'Longest Gap': summary['longest_gap'],
+                })
+            if streak_rows:
+                st.dataframe(pd.DataFrame(streak_rows), use_container_width=True, hide_index=True)
+                gap_lengths = streaks.summary(today=today)['gaps']
+                if gap_lengths:
+                    with perf.span('plotly.gap_lengths'):
+                        figure_chart(figures.get(('gap_lengths', version, today),
+                                                 lambda: _gap_lengths(gap_lengths)))
+            else:
+                st.info("No dose history to find streaks in yet.")
+    else:
+        st.info("No medication data available for analysis. Start logging your doses to see insights!")
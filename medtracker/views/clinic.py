@@ -0,0 +1,101 @@
+"""Clinic page: cohort adherence, at-risk patients and per-medication miss rates."""
+from datetime import datetime
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from medtracker import perf
+from medtracker.cohort import AT_RISK_ADHERENCE, AT_RISK_MISSES, RECENT_DAYS
+from medtracker.resources import get_cohort_analytics, get_cohort_store, get_figure_cache
+from medtracker.views.widgets import figure_chart
+
+# At-risk patients listed on the page
+AT_RISK_ROWS = 50
+# Width of the adherence distribution's bins, in percentage points
+ADHERENCE_BIN = 5
+
+
+def _adherence_distribution(adherence):
+    # Binned here, so the chart carries 20 bars rather than one value per patient
+    edges = np.arange(0, 100 + ADHERENCE_BIN, ADHERENCE_BIN)
+    counts, _ = np.histogram(adherence.dropna(), bins=edges)
+    fig_dist = go.Figure(data=[
+        go.Bar(
+            x=edges[:-1] + ADHERENCE_BIN / 2,
+            y=counts,
+            width=ADHERENCE_BIN,
+            marker_color='#3498db'
+        )
+    ])
+    fig_dist.update_layout(
+        title='Patients by Overall Adherence',
+        xaxis_title='Adherence Rate (%)',
+        yaxis_title='Number of Patients',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_dist
+
+
+def _medication_miss_rates(by_medication):
+    fig_meds = go.Figure(data=[
+        go.Bar(name='Missed', x=by_medication.index, y=by_medication['miss_rate'], marker_color='#e74c3c'),
+        go.Bar(name='Delayed', x=by_medication.index, y=by_medication['delay_rate'], marker_color='#f1c40f'),
+    ])
+    fig_meds.update_layout(
+        barmode='group',
+        xaxis_title='Medication',
+        yaxis_title='Share of Doses (%)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_meds
+
+
+def render():
+    cohort = get_cohort_analytics()
+    figures = get_figure_cache()
+
+    st.title("🏥 Clinic Overview")
+    today = datetime.now().date()
+    with perf.span('cohort.summary'):
+        tables = cohort.summary(today)
+    patients = tables['patients']
+    cohort_key = (get_cohort_store().version, today)
+    if patients.empty:
+        st.info("No patients have doses in the clinic log yet.")
+        return
+
+    clinic_col1, clinic_col2, clinic_col3, clinic_col4 = st.columns(4)
+    clinic_col1.metric("Patients", f"{len(patients):,}")
+    clinic_col2.metric("Median Adherence", f"{patients['adherence'].median():.1f}%")
+    clinic_col3.metric("At Risk", f"{int(patients['at_risk'].sum()):,}")
+    clinic_col4.metric("Doses Logged", f"{int(patients['doses'].sum()):,}")
+
+    # Adherence distribution across patients
+    st.markdown("### 📊 Adherence Distribution")
+    with perf.span('plotly.cohort_adherence'):
+        figure_chart(figures.get(('cohort_adherence',) + cohort_key,
+                                 lambda: _adherence_distribution(patients['adherence'])))
+
+    # At-risk ranking
+    st.markdown("### 🚨 At-Risk Patients")
+    st.caption(f"Below {AT_RISK_ADHERENCE}% adherence over the last {RECENT_DAYS} days, "
+               f"{AT_RISK_MISSES}+ missed days in a row, or no doses in that time.")
+    at_risk = cohort.at_risk(today, limit=AT_RISK_ROWS)
+    if not at_risk.empty:
+        st.dataframe(at_risk.drop(columns='at_risk').round(1).rename(columns={
+            'doses': 'Doses',
+            'adherence': 'Adherence (%)',
+            'recent_adherence': f'Last {RECENT_DAYS} Days (%)',
+            'missed_days_in_a_row': 'Missed Days in a Row',
+        }), use_container_width=True)
+    else:
+        st.success("No patients are currently at risk.")
+
+    # Per-medication miss rates
+    st.markdown("### 💊 Medication Miss Rates")
+    with perf.span('plotly.cohort_medications'):
+        figure_chart(figures.get(('cohort_medications',) + cohort_key,
+                                 lambda: _medication_miss_rates(tables['by_medication'])))
@@ -0,0 +1,191 @@
+"""Dashboard page: next dose, quick stats, inventory and today's schedule."""
+from datetime import datetime, timedelta
+
+import hydralit_components as hc
+import streamlit as st
+
+from medtracker.inventory import REFILL_LEAD_DAYS, refill_quantities, restock, stock_forecast
+from medtracker.notifications import STOCK_CHANGED
+from medtracker.resources import get_day_index, get_delivery_manager, get_rollups, get_streaks
+from medtracker.views.widgets import countdown, live
+
+# Upcoming due times handed to the countdown, so it moves on without a rerun
+COUNTDOWN_DOSES = 5
+
+
+@live(run_every=60)
+def next_dose():
+    """Countdown to the next dose; re-resolved every minute."""
+    now = datetime.now()
+    # Next occurrence across every dose rule and the reminder heap
+    next_reminder = st.session_state.schedule.next_due(now)
+    
+    if next_reminder:
+        next_med = next(
+            (med for med in st.session_state.medications if med['name'] == next_reminder['medication']),
+            {'name': next_reminder['medication'], 'dosage': '-', 'instructions': next_reminder['note']}
+        )
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            # Ticks every second in the browser, without a rerun
+            upcoming = st.session_state.schedule.occurrences(now, now + timedelta(days=2))
+            dues = {next_reminder['datetime']} | {item['datetime'] for item in upcoming}
+            countdown(sorted(dues)[:COUNTDOWN_DOSES])
+        
+        with col2:
+            st.markdown(f"""
+            <div style='padding: 20px; background-color: #f0f2f6; border-radius: 10px;'>
+                <h3 style='margin: 0;'>{next_med['name']}</h3>
+                <p style='margin: 5px 0;'>Dosage: {next_med['dosage']}</p>
+                <p style='margin: 5px 0;'>{next_med['instructions']}</p>
+                <p style='margin: 5px 0;'>Due at: {next_reminder['datetime'].strftime('%H:%M')}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.info("No upcoming doses scheduled.")
+
+
+def request_refill(stock):
+    # Runs before the rerun, so the inventory cards already show the new stock
+    quantities = refill_quantities(stock)
+    if quantities.empty:
+        st.session_state.refill_message = f"All medications are stocked for the next {REFILL_LEAD_DAYS} days."
+        return
+    restock(st.session_state.medications, quantities)
+    st.session_state.notifications.publish(STOCK_CHANGED, medications=list(st.session_state.medications))
+    ordered = ", ".join(f"{units} × {medication}" for medication, units in quantities.items())
+    st.session_state.refill_message = f"Refill request sent to pharmacy: {ordered}."
+
+
+def render():
+    rollups = get_rollups()
+    streaks = get_streaks()
+    day_index = get_day_index()
+    delivery_manager = get_delivery_manager()
+
+    st.title("📊 MedTracker Dashboard")
+    
+    # Next Medication Countdown
+    st.markdown("### ⏰ Next Medication Due")
+    next_dose()
+    
+    # Quick Stats in modern cards
+    with st.container():
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            hc.info_card(
+                title="Active Medications",
+                content=str(len(st.session_state.medications)),
+                sentiment='good',
+                bar_value=len(st.session_state.medications) * 10
+            )
+        
+        with col2:
+            today_doses = rollups.day_total(datetime.now().date())
+            hc.info_card(
+                title="Today's Doses",
+                content=str(today_doses),
+                sentiment='good' if today_doses > 0 else 'neutral',
+                bar_value=today_doses * 20
+            )
+        
+        with col3:
+            adherence_rate = rollups.adherence_rate()
+            hc.info_card(
+                title="Adherence Rate",
+                content=f"{adherence_rate:.1f}%",
+                sentiment='good' if adherence_rate > 80 else 'neutral',
+                bar_value=adherence_rate
+            )
+        
+        with col4:
+            drone_status = delivery_manager.drone_status
+            hc.info_card(
+                title="Drone Status",
+                content=drone_status,
+                sentiment='good' if drone_status == 'Available' else 'warning',
+                bar_value=100 if drone_status == 'Available' else 50
+            )
+
+    # Adherence streaks, kept current as doses are logged
+    st.markdown("### 🔥 Adherence Streaks")
+    today = datetime.now().date()
+    streak_summary = streaks.summary(today=today)
+    streak_col1, streak_col2, streak_col3 = st.columns(3)
+    with streak_col1:
+        hc.info_card(
+            title="Current Streak",
+            content=f"{streak_summary['current_streak']} days",
+            sentiment='good' if streak_summary['current_streak'] else 'neutral',
+            bar_value=min(streak_summary['current_streak'] / 30 * 100, 100)
+        )
+    with streak_col2:
+        hc.info_card(
+            title="Longest Streak",
+            content=f"{streak_summary['longest_streak']} days",
+            sentiment='good',
+            bar_value=min(streak_summary['longest_streak'] / 30 * 100, 100)
+        )
+    with streak_col3:
+        hc.info_card(
+            title="Longest Gap",
+            content=f"{streak_summary['longest_gap']} days",
+            sentiment='good' if streak_summary['longest_gap'] < 2 else 'warning',
+            bar_value=min(streak_summary['longest_gap'] / 7 * 100, 100)
+        )
+    for medication, misses in streaks.alerts(today=today).items():
+        st.warning(f"{medication} has been missed {misses} days in a row.")
+
+    # Medication Stock Alerts, projected from recent consumption
+    st.markdown("### 📦 Inventory Status")
+    stock = stock_forecast(st.session_state.medications, day_index, today)
+    stock_cols = st.columns(3)
+    # itertuples keeps each column's dtype, so integer stock isn't shown as a float
+    for idx, row in enumerate(stock.itertuples()):
+        with stock_cols[idx % 3]:
+            days_left = row.days_to_threshold
+            sentiment = 'good' if days_left > 2 * REFILL_LEAD_DAYS else 'warning' if days_left > 0 else 'poor'
+            runway = "no recent use" if days_left == float('inf') else f"refill in ~{days_left:.0f} days"
+            
+            hc.info_card(
+                title=row.Index,
+                content=f"{row.stock} pills remaining · {runway}",
+                sentiment=sentiment,
+                bar_value=min(row.stock / max(row.refill_threshold, 1) * 100, 100)
+            )
+
+    # Today's Schedule Timeline
+    st.markdown("### 📅 Today's Schedule")
+    today_reminders = st.session_state.schedule.on_day(datetime.now().date())
+    
+    for reminder in today_reminders[:5]:
+        reminder_time = reminder['datetime']
+        is_past = reminder_time < datetime.now()
+        
+        with st.container():
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                st.markdown(f"### {reminder_time.strftime('%I:%M %p')}")
+            with col2:
+                if is_past:
+                    st.markdown(f"~~{reminder['medication']}: {reminder['note']}~~")
+                else:
+                    st.markdown(f"**{reminder['medication']}**: {reminder['note']}")
+
+    # Quick Actions
+    st.markdown("### ⚡ Quick Actions")
+    quick_col1, quick_col2, quick_col3 = st.columns(3)
+    
+    with quick_col1:
+        if st.button("💊 Log New Dose", use_container_width=True):
+            st.session_state.quick_log = True
+    
+    with quick_col2:
+        st.button("🔄 Request Refill", use_container_width=True, on_click=request_refill, args=(stock,))
+        if st.session_state.get('refill_message'):
+            st.success(st.session_state.pop('refill_message'))
+    
+    with quick_col3:
+        if st.button("👨‍⚕️ Contact Doctor", use_container_width=True):
+            st.info("Opening messaging interface...")
@@ -0,0 +1,36 @@
+"""Hidden Diagnostics page with the perf recorder's spans and runs."""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from medtracker import perf
+
+
+def render():
+    st.title("🩺 Diagnostics")
+    
+    if not perf.recorder.enabled:
+        st.info("Instrumentation is off. Start the app with MEDTRACKER_PERF=1 to record timings.")
+    else:
+        diag_col1, diag_col2, diag_col3 = st.columns(3)
+        diag_col1.metric("Reruns (this session)", st.session_state.reruns)
+        diag_col2.metric("Reruns (all sessions)", perf.recorder.counters['reruns_total'])
+        diag_col3.metric("Dose rows scanned", f"{perf.recorder.counters['dose_rows_scanned_total']:,}")
+        
+        st.markdown("### ⏱️ Spans")
+        st.dataframe(pd.DataFrame(perf.recorder.summary()), use_container_width=True, hide_index=True)
+        
+        st.markdown("### 🔁 Recent Runs")
+        recent_runs = [
+            {
+                'session': run['session'],
+                'time': datetime.fromtimestamp(run['ts']).strftime('%H:%M:%S'),
+                'spans_ms': sum(span['seconds'] for span in run['spans']) * 1000,
+                'slowest': max(run['spans'], key=lambda span: span['seconds'])['name'] if run['spans'] else '',
+                'rows_scanned': run['counters'].get('dose_rows_scanned_total', 0),
+            }
+            for run in reversed(perf.recorder.runs)
+        ]
+        st.dataframe(pd.DataFrame(recent_runs), use_container_width=True, hide_index=True)
+        st.caption(f"Metrics are exported to {perf.recorder.export_path}")
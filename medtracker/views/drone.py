@@ -0,0 +1,133 @@
+"""Drone Service page: house layout, route planning and delivery jobs."""
+import streamlit as st
+
+from medtracker.drone import ACTIVE_STATUSES, POLL_SECONDS
+from medtracker.notifications import DELIVERY_FINISHED
+from medtracker.resources import get_delivery_manager
+from medtracker.routing import ROOMS
+from medtracker.views.widgets import live
+
+
+def delivery_progress(job_ids, polling):
+    """This session's deliveries; ``polling`` while any of them is in flight."""
+    # Deliveries run in the background; this only reads their state
+    delivery_jobs = get_delivery_manager().jobs(job_ids)
+    if delivery_jobs:
+        st.markdown("#### 📦 Deliveries")
+    for job in delivery_jobs:
+        if job['status'] == 'Delivered':
+            st.success(f"✅ Delivery #{job['id']} completed! Medications have been delivered to {job['destination']}.")
+        elif job['status'] == 'Failed':
+            st.error(f"Delivery #{job['id']} to {job['destination']} failed: {job['error']}")
+        elif job['status'] == 'Returning':
+            st.info(f"🔄 Delivery #{job['id']} delivered to {job['destination']}. Returning to kitchen...")
+        else:
+            st.progress(job['progress'], text=f"🚁 Delivery #{job['id']} to {job['destination']}: {job['status']}")
+
+    if polling and not any(job['status'] in ACTIVE_STATUSES for job in delivery_jobs):
+        # The last one landed: redraw the drone's status and stop polling
+        st.rerun()
+
+
+def render():
+    delivery_manager = get_delivery_manager()
+
+    st.title("🚁 Medication Delivery Drone")
+    
+    route_planner = delivery_manager.planner
+    drone_location = delivery_manager.location
+    
+    # House layout is rendered from the route planner's room graph
+    room_cards = "".join(
+        f"""
+                    <div class='room'>
+                        <h4>{room}</h4>
+                        <div class='room-icon'>{ROOMS[room][0]}</div>
+                        {"<div class='drone'>🚁</div>" if room == drone_location else ""}
+                    </div>"""
+        for room in route_planner.destinations
+    )
+    
+    # Status Cards
+    st.markdown(f"""
+        <div class='status-container'>
+            <div class='status-card'>
+                <h3>🛸 Drone Status</h3>
+                <p class='status-text'>{delivery_manager.drone_status}</p>
+            </div>
+            <div class='status-card'>
+                <h3>📍 Current Location</h3>
+                <p class='status-text'>{drone_location}</p>
+            </div>
+        </div>
+        
+        <div class='house-layout'>
+            <!-- House Layout -->
+            <div class='floor'>
+                <h3>House Layout</h3>
+                <div class='rooms'>{room_cards}
+                </div>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Drone Controls
+    st.markdown("### 🎮 Drone Controls")
+    
+    # Create columns for destination selection and actions
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        destinations = st.multiselect(
+            "Select Destinations",
+            route_planner.destinations,
+            default=["Bedroom"],
+            key="drone_destinations",
+            help="Several rooms are batched into a single sortie"
+        )
+    
+    # Additional options
+    st.markdown("#### Advanced Settings")
+    col3, col4, col5 = st.columns(3)
+    
+    with col3:
+        avoid_stairs = st.checkbox("Avoid Stairs", value=True, help="Route drone to avoid stairs when possible",
+                                   key="drone_avoid_stairs")
+    with col4:
+        st.checkbox("Silent Mode", help="Reduce drone noise during delivery")
+    with col5:
+        return_to_base = st.checkbox("Return to Base", value=True, help="Return to kitchen after delivery",
+                                     key="drone_return_to_base")
+    
+    with col2:
+        if destinations:
+            # Planned routes are memoized per (start, stops, settings)
+            planned_route = route_planner.route(drone_location, tuple(sorted(destinations)),
+                                                avoid_stairs, return_to_base)
+            st.markdown("**Planned Route**")
+            st.markdown(" → ".join(planned_route.path))
+            st.caption(f"{planned_route.cost:.0f} m flight"
+                       + (" · uses the stairwell" if planned_route.uses_stairs else ""))
+    
+    # Start Delivery Button
+    if 'delivery_jobs' not in st.session_state:
+        st.session_state.delivery_jobs = []
+    
+    notifications = st.session_state.notifications
+    
+    def start_delivery():
+        job_id = delivery_manager.submit(
+            st.session_state.drone_destinations,
+            avoid_stairs=st.session_state.drone_avoid_stairs,
+            return_to_base=st.session_state.drone_return_to_base,
+            on_finish=lambda job: notifications.publish(DELIVERY_FINISHED, job=job)
+        )
+        st.session_state.delivery_jobs.append(job_id)
+    
+    st.button("Start Delivery", key="start_delivery", help="Click to start drone delivery", on_click=start_delivery,
+              disabled=not destinations)
+    
+    # Only the deliveries are redrawn while they fly, not the whole page
+    job_ids = tuple(st.session_state.delivery_jobs)
+    polling = any(job['status'] in ACTIVE_STATUSES for job in delivery_manager.jobs(job_ids))
+    live(run_every=POLL_SECONDS if polling else None)(delivery_progress)(job_ids, polling)
@@ -0,0 +1,177 @@
+"""Medications page: manage the medication list, log doses and bulk import/export the dose log."""
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from medtracker import DATA_DIR
+from medtracker.catalog import paginate
+from medtracker.inventory import use_stock
+from medtracker.notifications import DOSE_LOGGED, STOCK_CHANGED
+from medtracker.resources import get_dose_store, get_dose_writer
+from medtracker.schedule import DoseRule
+from medtracker.transfer import export_doses, file_format, import_doses
+from medtracker.views.widgets import medication_choices, save_pending_doses
+
+# Larger exports stay on the server; the browser download is served from memory
+DOWNLOAD_LIMIT_MB = 200
+# Medications shown per page of the list
+PAGE_SIZE = 20
+
+
+def remove_medication(med_id):
+    # Runs before the rerun, so the list is drawn once, without the removed entry
+    med = st.session_state.medications.remove_id(med_id)
+    st.session_state.schedule.remove(med['name'])
+
+
+def turn_page(step):
+    st.session_state.medication_page += step
+
+
+def reset_page():
+    st.session_state.medication_page = 0
+
+
+def render():
+    dose_store = get_dose_store()
+
+    st.title("💊 Medications Management")
+    
+    # Add new medication
+    with st.expander("Add New Medication"):
+        with st.form("add_medication"):
+            med_name = st.text_input("Medication Name")
+            dosage = st.text_input("Dosage")
+            frequency = st.selectbox("Frequency", 
+                ["Once daily", "Twice daily", "Three times daily", "As needed"])
+            instructions = st.text_area("Special Instructions")
+            
+            if st.form_submit_button("Add Medication"):
+                if med_name and dosage:
+                    new_med = {
+                        'name': med_name,
+                        'dosage': dosage,
+                        'frequency': frequency,
+                        'instructions': instructions,
+                        'stock': 30,
+                        'refill_threshold': 10,
+                        'category': 'Other'
+                    }
+                    st.session_state.medications.append(new_med)
+                    st.session_state.schedule.set_rule(DoseRule.for_medication(new_med, datetime.now().date()))
+                    st.session_state.notifications.publish(STOCK_CHANGED, medications=[new_med])
+                    st.success(f"Added {med_name} to medications list!")
+    
+    # List current medications, one page of search results at a time
+    st.subheader("Current Medications")
+    medications = st.session_state.medications
+    if medications:
+        if 'medication_page' not in st.session_state:
+            st.session_state.medication_page = 0
+        query = st.text_input("Search Medications", key='medication_search', on_change=reset_page,
+                              placeholder="Name, the start of a name, or a close spelling")
+        matches = medications.search(query)
+        shown, page, page_count = paginate(matches, st.session_state.medication_page, PAGE_SIZE)
+        st.session_state.medication_page = page
+        for med_id in shown:
+            med = medications.get(med_id)
+            with st.expander(f"{med['name']} - {med['dosage']}"):
+                st.write(f"Frequency: {med['frequency']}")
+                st.write(f"Instructions: {med['instructions']}")
+                st.button(f"Remove {med['name']}", key=f"remove_{med_id}", on_click=remove_medication,
+                          args=(med_id,))
+        if not matches:
+            st.info("No medications match your search.")
+        elif page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            prev_col.button("◀ Previous", key='medication_prev', on_click=turn_page, args=(-1,),
+                            disabled=page == 0, use_container_width=True)
+            page_col.caption(f"Page {page + 1} of {page_count} · {len(matches):,} medications")
+            next_col.button("Next ▶", key='medication_next', on_click=turn_page, args=(1,),
+                            disabled=page == page_count - 1, use_container_width=True)
+    else:
+        st.write("No medications added yet")
+
+    # Log a dose
+    st.subheader("Log a Dose")
+    dose_status = None
+    med_options = medication_choices('log_dose_search')
+    with st.form("log_dose"):
+        med_choice = st.selectbox("Select Medication", med_options)
+        status = st.selectbox("Status", ["Taken", "Missed", "Delayed"])
+        taken_time = st.time_input("Time", step=60)
+        notes = st.text_area("Notes")
+        
+        if st.form_submit_button("Log Dose"):
+            if med_choice != 'No medications':
+                today = datetime.now().date()
+                when = datetime.combine(today, taken_time)
+                # Link the dose to the scheduled occurrence it fulfills, for the timing analytics
+                scheduled = st.session_state.schedule.scheduled_for(med_choice, when)
+                notifications = st.session_state.notifications
+                units = 0 if status == 'Missed' else 1
+                # Taken out of stock now and put back if the dose can't be saved
+                if units:
+                    use_stock(st.session_state.medications, med_choice, units)
+                medications = list(st.session_state.medications)
+
+                def dose_written():
+                    # Re-forecast every medication, since the logged dose moves the consumption rates
+                    notifications.publish(STOCK_CHANGED, medications=medications)
+                    notifications.publish(DOSE_LOGGED, medication=med_choice, status=status, date=today)
+
+                # Written in the background with other sessions' doses; the rules run once it's in the log
+                ticket = get_dose_writer().append_dose(
+                    med_choice, today, status, notes, taken_at=None if status == 'Missed' else when,
+                    scheduled_at=scheduled, on_commit=dose_written)
+                st.session_state.setdefault('pending_doses', []).append((ticket, med_choice, units))
+                dose_status = st.empty()
+                dose_status.info("Saving dose...")
+
+    # Bulk import and export of the dose log
+    st.subheader("Import / Export Doses")
+    with st.expander("Import Doses"):
+        # The uploaded file is held in memory until it is imported
+        st.caption("CSV or Parquet with `date`, `medication` and `status` columns; `notes`, `taken_at` and "
+                   "`scheduled_at` are optional. Rows for unknown medications or statuses are skipped. "
+                   f"Files up to {st.get_option('server.maxUploadSize'):,} MB.")
+        upload = st.file_uploader("Dose log file", type=['csv', 'parquet'])
+        if upload is not None and st.button("Import Doses"):
+            try:
+                report = import_doses(upload, dose_store, file_format(upload.name),
+                                      medications=[med['name'] for med in st.session_state.medications],
+                                      patient=0)
+            except ValueError as exc:
+                st.error(str(exc))
+            else:
+                st.success(f"Imported {report['imported']:,} of {report['rows']:,} doses.")
+                if report['rejected']:
+                    st.warning(f"Skipped {report['rejected']:,} invalid rows.")
+                    st.dataframe(pd.DataFrame(report['errors'], columns=['Row', 'Problem']), hide_index=True)
+                st.session_state.notifications.publish(STOCK_CHANGED, medications=list(st.session_state.medications))
+
+    with st.expander("Export Doses"):
+        export_format = st.radio("Format", ['Parquet', 'CSV'], horizontal=True)
+        if st.button("Prepare Export"):
+            fmt = export_format.lower()
+            path = os.path.join(DATA_DIR, 'exports', f"doses-{datetime.now():%Y%m%d-%H%M%S}.{fmt}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with st.spinner("Exporting doses..."):
+                written = export_doses(dose_store, path, fmt)
+            st.success(f"Exported {written:,} doses.")
+            # Offered only in this run, so later reruns don't read the file back in
+            size_mb = os.path.getsize(path) / 2 ** 20
+            if size_mb <= DOWNLOAD_LIMIT_MB:
+                with open(path, 'rb') as export_file:
+                    st.download_button("Download Export", export_file, file_name=os.path.basename(path))
+            else:
+                st.info(f"The export ({size_mb:,.0f} MB) is too large to download here; it was written to "
+                        f"`{path}`.")
+
+    # Confirmed once the rest of the page is drawn, which gives the writer time to batch it
+    if dose_status is not None:
+        with dose_status.container():
+            if save_pending_doses():
+                st.success("Dose logged successfully!")
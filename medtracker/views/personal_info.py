@@ -0,0 +1,19 @@
+"""Personal Info page."""
+import streamlit as st
+
+
+def render():
+    st.title("👤 Personal Information")
+    
+    with st.form("personal_info_form"):
+        st.session_state.personal_info['name'] = st.text_input("Full Name", 
+            st.session_state.personal_info.get('name', ''))
+        st.session_state.personal_info['age'] = st.number_input("Age", 
+            value=int(st.session_state.personal_info.get('age', 0)) if st.session_state.personal_info.get('age') else 0)
+        st.session_state.personal_info['address'] = st.text_area("Address", 
+            st.session_state.personal_info.get('address', ''))
+        st.session_state.personal_info['emergency_contact'] = st.text_input("Emergency Contact", 
+            st.session_state.personal_info.get('emergency_contact', ''))
+        
+        if st.form_submit_button("Save Information"):
+            st.success("Personal information updated successfully!")
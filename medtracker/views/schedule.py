@@ -0,0 +1,79 @@
+"""Schedule page: one-off reminders and the dose calendar."""
+from datetime import datetime
+
+import streamlit as st
+from streamlit_calendar import calendar
+
+from medtracker.calendar_feed import VIEWS, EventFeed, shift_anchor, view_from_callback, visible_range
+from medtracker.views.widgets import medication_choices
+
+
+def render():
+    st.title("📅 Schedule and Reminders")
+    
+    # Add new reminder
+    with st.expander("Add New Reminder"):
+        med_options = medication_choices('reminder_search')
+        with st.form("add_reminder"):
+            med_choice = st.selectbox("Select Medication", med_options)
+            reminder_date = st.date_input("Date")
+            reminder_time = st.time_input("Time")
+            reminder_note = st.text_area("Note")
+            
+            if st.form_submit_button("Set Reminder"):
+                if med_choice != 'No medications':
+                    reminder_datetime = datetime.combine(reminder_date, reminder_time)
+                    st.session_state.reminders.add(med_choice, reminder_datetime, reminder_note)
+                    st.success("Reminder set successfully!")
+
+    # Calendar view
+    st.subheader("Calendar")
+    if 'calendar_anchor' not in st.session_state:
+        st.session_state.calendar_view = 'Month'
+        st.session_state.calendar_anchor = datetime.now().date()
+    if st.session_state.schedule.diverged:
+        if 'event_feed' not in st.session_state:
+            st.session_state.event_feed = EventFeed(st.session_state.schedule)
+        event_feed = st.session_state.event_feed
+    else:
+        # Untouched schedules share the baseline's cached pages
+        event_feed = st.session_state.baseline.event_feed
+    
+    # Apply a view reported by the calendar on the previous run
+    if st.session_state.get('calendar_reported'):
+        reported_type, st.session_state.calendar_anchor = st.session_state.pop('calendar_reported')
+        st.session_state.calendar_view = next(label for label, view in VIEWS.items() if view == reported_type)
+    
+    nav_col1, nav_col2, nav_col3, nav_col4 = st.columns([1, 1, 1, 2])
+    with nav_col4:
+        calendar_view = VIEWS[st.selectbox("View", list(VIEWS), key='calendar_view',
+                                           label_visibility='collapsed')]
+    with nav_col1:
+        if st.button("◀ Previous", use_container_width=True):
+            st.session_state.calendar_anchor = shift_anchor(calendar_view, st.session_state.calendar_anchor, -1)
+    with nav_col2:
+        if st.button("Today", use_container_width=True):
+            st.session_state.calendar_anchor = datetime.now().date()
+    with nav_col3:
+        if st.button("Next ▶", use_container_width=True):
+            st.session_state.calendar_anchor = shift_anchor(calendar_view, st.session_state.calendar_anchor, 1)
+    
+    # Only the visible window (plus a buffer) is sent to the browser
+    calendar_anchor = st.session_state.calendar_anchor
+    window_start, window_end = visible_range(calendar_view, calendar_anchor)
+    calendar_state = calendar(
+        events=event_feed.events(window_start, window_end),
+        options={
+            'initialView': calendar_view,
+            'initialDate': calendar_anchor.isoformat(),
+            'headerToolbar': {'left': '', 'center': 'title', 'right': ''},
+        },
+        callbacks=['dateClick', 'eventClick', 'select'],
+        key=f"calendar_{calendar_view}_{window_start.isoformat()}"
+    )
+    
+    # Follow the view reported by the calendar if it moved on its own
+    reported_view = view_from_callback(calendar_state)
+    if reported_view and visible_range(*reported_view)[0] != window_start:
+        st.session_state.calendar_reported = reported_view
+        st.rerun()
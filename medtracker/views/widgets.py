@@ -0,0 +1,121 @@
+"""Self-refreshing widgets shared by the pages.
+
+``live`` makes a widget function a Streamlit fragment, rerun on its own
+timer without re-executing the script. The countdown ticks in the browser and
+moves on to the following dose by itself, so it never needs a rerun to stay
+current.
+
+``figure_chart`` draws a cached Plotly figure. ``save_pending_doses``
+confirms the doses a session queued with the ``DoseWriter``.
+``medication_choices`` keeps medication selectboxes short when the list is a
+whole formulary.
+"""
+import json
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from medtracker.inventory import restock
+from medtracker.resources import get_dose_writer
+
+# How long the countdown reads "Due now" before moving on to the following dose
+DUE_NOW_SECONDS = 60
+
+# Seconds a run waits for a queued dose before leaving it to the next run
+DOSE_SAVE_TIMEOUT = 5
+
+# Medication selectboxes list at most this many names; longer lists are searched first
+MAX_MEDICATION_OPTIONS = 50
+
+COUNTDOWN_HTML = """
+<div style='font-family: "Source Sans Pro", sans-serif; text-align: center; padding: 20px;
+            background-color: #f0f2f6; border-radius: 10px;'>
+    <h1 id='countdown' style='font-size: 2.5em; margin: 0;'>--:--:--</h1>
+    <p style='margin: 5px 0;'>until next dose</p>
+</div>
+<script>
+const dues = %s;
+const label = document.getElementById('countdown');
+function tick() {
+    const now = Date.now();
+    while (dues.length > 1 && now >= dues[0] + %d) {
+        dues.shift();
+    }
+    const left = Math.max(0, Math.floor((dues[0] - now) / 1000));
+    if (left === 0) {
+        label.textContent = 'Due now';
+        if (dues.length > 1) {
+            setTimeout(tick, dues[0] + %d - now);
+        }
+        return;
+    }
+    const parts = [Math.floor(left / 3600), Math.floor(left %% 3600 / 60), left %% 60];
+    label.textContent = parts.map(n => String(n).padStart(2, '0')).join(':');
+    setTimeout(tick, 1000 - Date.now() %% 1000);
+}
+tick();
+</script>
+"""
+
+
+def live(run_every):
+    """Rerun the decorated widget function alone every ``run_every`` seconds.
+
+    With ``run_every=None`` it only reruns with the script.
+    """
+    return st.fragment(run_every=run_every)
+
+
+def figure_chart(figure):
+    """Draw the Plotly ``figure`` at full container width."""
+    # A go.Figure is already validated, so st.plotly_chart only serializes it
+    st.plotly_chart(figure, use_container_width=True)
+
+
+def countdown(dues):
+    """A clock counting down to each naive local datetime in ``dues`` in turn, in the browser."""
+    # The markup only changes when a due time passes, so reruns don't reload the frame
+    times = json.dumps([int(due.timestamp() * 1000) for due in dues])
+    grace = DUE_NOW_SECONDS * 1000
+    components.html(COUNTDOWN_HTML % (times, grace, grace), height=130)
+
+
+def medication_choices(key):
+    """Names for a "Select Medication" box, or ``['No medications']``.
+
+    Lists longer than ``MAX_MEDICATION_OPTIONS`` get a search box (keyed
+    ``key``) and only their best matches are offered. Call it outside any
+    form, so the options follow the search as it is typed.
+    """
+    medications = st.session_state.medications
+    if not medications:
+        return ['No medications']
+    if len(medications) <= MAX_MEDICATION_OPTIONS:
+        return [med['name'] for med in medications]
+    query = st.text_input("Find Medication", key=key, placeholder=f"Search {len(medications):,} medications")
+    matches = medications.search(query, limit=MAX_MEDICATION_OPTIONS)
+    return [medications.get(med_id)['name'] for med_id in matches] or ['No medications']
+
+
+def save_pending_doses(timeout=DOSE_SAVE_TIMEOUT):
+    """Wait for the doses this session queued; ``True`` once all are in the log.
+
+    A dose that could not be saved is reported and its stock put back. Doses
+    still queued after ``timeout`` seconds are reported and waited on again
+    next run.
+    """
+    pending = st.session_state.get('pending_doses')
+    saved = True
+    while pending:
+        ticket, medication, units = pending[0]
+        try:
+            if not get_dose_writer().wait(ticket, timeout):
+                st.warning("A logged dose is taking long to save; it will be checked again on the next run.")
+                return False
+        except Exception as exc:
+            saved = False
+            if units:
+                restock(st.session_state.medications, {medication: units})
+            st.error(f"A logged {medication} dose could not be saved: {exc}")
+        pending.pop(0)
+    return saved
@@ -0,0 +1,160 @@
+"""Write-behind queue for dose appends.
+
+Form submits hand their dose to the ``DoseWriter`` and return at once with a
+ticket. A background thread owned by the app process groups queued doses into
+one ``DoseStore.append_many`` transaction per batch, writing when
+``max_batch`` doses are waiting or the oldest has waited ``max_delay``
+seconds. A session keeps the tickets of its queued doses and waits on them
+before reading the log, so it always sees its own doses; waiting also asks the
+writer to commit without the delay. Pending doses are flushed when the process
+exits.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from medtracker import perf
+from medtracker.records import STATUSES
+
+# Failed doses remembered for the sessions that submitted them
+_ERROR_HISTORY = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class DoseWriter:
+    """Batches dose appends to ``store`` on a background thread."""
+
+    def __init__(self, store, max_batch=256, max_delay=0.02):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        # (queued at, ticket, dose, on_commit), oldest first
+        self._pending = []
+        self._issued = 0
+        self._committed = 0
+        # Highest ticket someone is waiting on; batches up to it skip the delay
+        self._urgent = 0
+        self._errors = OrderedDict()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='dose-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append_dose(self, medication, date, status, notes='', taken_at=None, scheduled_at=None, patient_id=0,
+                    on_commit=None):
+        """Queue a single dose; returns its ticket.
+
+        Arguments are those of ``DoseStore.append_dose``. ``on_commit()`` is
+        called from the writer thread once the dose is in the log, before
+        ``wait`` returns for it.
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Unknown dose status: {status!r}")
+        dose = {'medication': medication, 'date': date, 'status': status, 'notes': notes,
+                'taken_at': taken_at, 'scheduled_at': scheduled_at, 'patient_id': patient_id}
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('dose writer is closed')
+            self._issued += 1
+            self._pending.append((time.monotonic(), self._issued, dose, on_commit))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            return self._issued
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            deadline = self._pending[0][0] + self.max_delay
+            while len(self._pending) < self.max_batch and not self._closed \
+                    and self._urgent < self._pending[0][1]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _write(self, batch):
+        failed = {}
+        with perf.span('writer.batch'):
+            version = self.store.version
+            try:
+                self.store.append_many([dose for _, _, dose, _ in batch])
+            except Exception:
+                # A batch that committed before a listener failed must not be written twice
+                if self.store.version == version:
+                    # Retry one by one, so a bad dose doesn't take its batch down with it
+                    for _, ticket, dose, _ in batch:
+                        version = self.store.version
+                        try:
+                            self.store.append_many([dose])
+                        except Exception as exc:
+                            # Likewise, a dose that committed before a listener failed was saved
+                            if self.store.version == version:
+                                failed[ticket] = exc
+        perf.count('dose_write_batches_total')
+        perf.count('dose_writes_total', len(batch) - len(failed))
+        # Callbacks finish before waiters are released, so a rerun sees their effects
+        for _, ticket, _, on_commit in batch:
+            if on_commit is not None and ticket not in failed:
+                # A failing callback must not stop the writer
+                try:
+                    on_commit()
+                except Exception:
+                    logger.exception('dose on_commit callback failed')
+        with self._cond:
+            self._errors.update(failed)
+            while len(self._errors) > _ERROR_HISTORY:
+                self._errors.popitem(last=False)
+            self._committed = batch[-1][1]
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def wait(self, ticket, timeout=None):
+        """Block until the dose with ``ticket`` (and every earlier one) is written.
+
+        Returns ``False`` on timeout. Raises the error that kept the dose out
+        of the log, if any.
+        """
+        with self._cond:
+            if ticket > self._urgent:
+                self._urgent = ticket
+                self._cond.notify_all()
+            if not self._cond.wait_for(lambda: self._committed >= ticket, timeout):
+                return False
+            error = self._errors.pop(ticket, None)
+        if error is not None:
+            raise error
+        return True
+
+    def flush(self, timeout=None):
+        """Write every dose queued so far; ``False`` on timeout."""
+        with self._cond:
+            ticket = self._issued
+        return self.wait(ticket, timeout) if ticket else True
+
+    @property
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def close(self, timeout=None):
+        """Flush the queue and stop the writer thread; later doses are refused."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
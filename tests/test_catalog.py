@@ -0,0 +1,75 @@
+import pytest
+
+from medtracker.baseline import MedicationList
+from medtracker.catalog import SearchIndex, paginate
+
+NAMES = ['Isoniazid (INH)', 'Rifampin (RIF)', 'Rifapentine (RPT)', 'Pyrazinamide (PZA)', 'Ethambutol (EMB)',
+         'Vitamin B6 (Pyridoxine)']
+
+
+def _index():
+    return SearchIndex(enumerate(NAMES))
+
+
+def test_prefix_matches_rank_whole_query_prefix_first():
+    index = _index()
+    assert [NAMES[i] for i in index.search('rifa')] == ['Rifampin (RIF)', 'Rifapentine (RPT)']
+    # 'pyr' starts a word of both names, but only one name starts with it
+    assert [NAMES[i] for i in index.search('pyr')][:2] == ['Pyrazinamide (PZA)', 'Vitamin B6 (Pyridoxine)']
+    assert index.search('rifa', limit=1) == [1]
+    assert index.search('  ') == []
+
+
+def test_every_query_word_must_match():
+    assert _index().search('vitamin pyri') == [5]
+
+
+def test_misspellings_match_by_trigrams():
+    assert _index().search('isoniazd')[0] == 0
+    assert _index().search('ethambutl')[0] == 4
+
+
+def test_add_remove_and_copy():
+    index = _index()
+    copy = index.copy()
+    index.remove(1)
+    index.add(10, 'Rifabutin')
+    assert [i for i in index.search('rifa')] == [10, 2]
+    assert copy.search('rifa') == [1, 2]
+    assert len(index) == len(copy) == len(NAMES)
+
+
+@pytest.mark.parametrize('page, expected', [(0, ([0, 1, 2], 0, 3)), (2, ([6], 2, 3)), (9, ([6], 2, 3)),
+                                            (-1, ([0, 1, 2], 0, 3))])
+def test_paginate_clamps_the_page(page, expected):
+    assert paginate(list(range(7)), page, 3) == expected
+
+
+def test_paginate_empty():
+    assert paginate([], 4, 3) == ([], 0, 1)
+
+
+def test_medication_list_copies_on_first_edit():
+    base = tuple({'name': name, 'stock': 30} for name in NAMES)
+    index = SearchIndex(zip(range(1, len(NAMES) + 1), NAMES))
+    meds = MedicationList(base, range(1, len(NAMES) + 1), index)
+    assert meds.shared
+    meds[0] = {**meds[0], 'name': 'Isoniazid 300 mg'}
+    assert not meds.shared
+    assert base[0]['name'] == 'Isoniazid (INH)'
+    assert index.search('isoniazid') == [1]
+    assert meds.search('300') == [1]
+    removed = meds.remove_id(2)
+    assert removed['name'] == 'Rifampin (RIF)'
+    assert meds.get(2) is None and meds.position(3) == 1
+    meds.append({'name': 'Rifabutin', 'stock': 10})
+    assert meds.ids[-1] == len(NAMES) + 1
+
+
+def test_medication_list_rejects_slices():
+    meds = MedicationList(({'name': 'Isoniazid (INH)'}, {'name': 'Rifampin (RIF)'}))
+    with pytest.raises(TypeError):
+        meds[0:1] = [{'name': 'Rifabutin'}]
+    with pytest.raises(TypeError):
+        del meds[:]
+    assert len(meds) == 2
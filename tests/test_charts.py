@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from medtracker.charts import FigureCache, lttb
+
+
+def _reference_lttb(x, y, threshold):
+    """Steinarsson's LTTB, one point at a time."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    selected, kept = [0], 0
+    for bucket in range(threshold - 2):
+        avg_start = math.floor((bucket + 1) * every) + 1
+        avg_end = min(math.floor((bucket + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        start, end = math.floor(bucket * every) + 1, math.floor((bucket + 1) * every) + 1
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs((x[kept] - avg_x) * (y[i] - y[kept]) - (x[kept] - x[i]) * (avg_y - y[kept]))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        kept = best
+    selected.append(n - 1)
+    return selected
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_lttb_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(10, 3000))
+    threshold = int(rng.integers(3, n))
+    x = np.sort(rng.uniform(0, 1e6, n))
+    y = rng.normal(size=n).cumsum()
+    assert list(lttb(x, y, threshold)) == _reference_lttb(list(x), list(y), threshold)
+
+
+def test_lttb_keeps_short_series():
+    assert list(lttb(np.arange(5), np.arange(5), 10)) == [0, 1, 2, 3, 4]
+
+
+def test_figure_cache_builds_once_and_evicts():
+    cache = FigureCache(max_entries=2)
+    builds = []
+
+    def build(name):
+        return lambda: builds.append(name) or {'name': name}
+
+    assert cache.get('a', build('a')) == {'name': 'a'}
+    cache.get('a', build('a'))
+    cache.get('b', build('b'))
+    cache.get('c', build('c'))
+    cache.get('a', build('a'))
+    assert builds == ['a', 'b', 'c', 'a']
+    assert len(cache) == 2
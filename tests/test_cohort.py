@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+import pytest
+
+from medtracker.cohort import PARTITION_PATIENTS, CohortAnalytics
+from medtracker.store import DoseStore
+
+TODAY = date(2024, 6, 30)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DoseStore(str(tmp_path / 'cohort.sqlite3'))
+    doses = []
+    # One patient that keeps every dose, one in another partition that misses the last three days
+    for n in range(10):
+        day = TODAY - timedelta(days=n)
+        doses.append({'medication': 'Isoniazid (INH)', 'date': day, 'status': 'Taken', 'patient_id': 1})
+        doses.append({'medication': 'Isoniazid (INH)', 'date': day, 'status': 'Missed' if n < 3 else 'Taken',
+                      'patient_id': PARTITION_PATIENTS + 1})
+    # Doses dated after today stay out of the recent window
+    doses.append({'medication': 'Isoniazid (INH)', 'date': TODAY + timedelta(days=3), 'status': 'Missed',
+                  'patient_id': 1})
+    store.append_many(doses)
+    yield store
+    store.close()
+
+
+def test_summary_across_partitions(store):
+    cohort = CohortAnalytics(store, workers=1)
+    patients = cohort.summary(TODAY)['patients']
+    assert list(patients.index) == [1, PARTITION_PATIENTS + 1]
+    assert list(patients['missed_days_in_a_row']) == [0, 3]
+    assert list(patients['recent_adherence']) == [100.0, 70.0]
+    assert list(cohort.at_risk(TODAY).index) == [PARTITION_PATIENTS + 1]
+
+
+def test_new_doses_refresh_their_partition(store):
+    cohort = CohortAnalytics(store, workers=1)
+    cohort.summary(TODAY)
+    store.append_dose('Isoniazid (INH)', TODAY, 'Missed', patient_id=1)
+    assert cohort.summary(TODAY)['patients'].loc[1, 'doses'] == 12
+
+
+def test_close_shuts_the_pool_down(store):
+    cohort = CohortAnalytics(store, workers=2)
+    serial = CohortAnalytics(store, workers=1).summary(TODAY)['patients']
+    pooled = cohort.summary(TODAY)['patients']
+    assert cohort._pool is not None
+    assert pooled.equals(serial)
+    cohort.close()
+    assert cohort._pool is None
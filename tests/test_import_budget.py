@@ -0,0 +1,10 @@
+import statistics
+
+from benchmarks import import_budget
+
+
+def test_app_imports_stay_within_budget():
+    runs = import_budget.measure(repeat=3)
+    assert runs[0]['deferred_loaded'] == []
+    assert statistics.median(run['app_s'] for run in runs) <= import_budget.BUDGET_S
+    assert set(runs[0]['pages']) >= {'Dashboard', 'Medications', 'Clinic'}
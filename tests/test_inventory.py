@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from medtracker.inventory import consumption_rates, prescribed_rates, stock_forecast
+from medtracker.timeindex import DayIndex
+
+TODAY = date(2024, 6, 30)
+MEDICATIONS = [
+    {'name': 'Isoniazid (INH)', 'frequency': 'Once daily', 'stock': 30, 'refill_threshold': 10},
+    {'name': 'Rifampin (RIF)', 'frequency': 'Twice daily', 'stock': 5, 'refill_threshold': 10},
+]
+
+
+def _index(last_day, days=28):
+    return DayIndex([{'medication': 'Isoniazid (INH)', 'date': last_day - timedelta(days=n), 'status': 'Taken'}
+                     for n in range(days)])
+
+
+def test_rates_from_recent_doses():
+    rates = consumption_rates(_index(TODAY), MEDICATIONS, TODAY, lookback=14)
+    # One dose a day for Isoniazid; Rifampin was never logged
+    assert list(rates) == [1.0, 2.0]
+
+
+def test_stale_log_uses_prescribed_rates():
+    rates = consumption_rates(_index(TODAY - timedelta(days=30)), MEDICATIONS, TODAY, lookback=14)
+    assert np.array_equal(rates, prescribed_rates(MEDICATIONS))
+
+
+def test_empty_index_uses_prescribed_rates():
+    assert np.array_equal(consumption_rates(DayIndex(), MEDICATIONS, TODAY), prescribed_rates(MEDICATIONS))
+    assert np.array_equal(consumption_rates(None, MEDICATIONS, TODAY), prescribed_rates(MEDICATIONS))
+
+
+def test_stock_forecast_with_stale_log():
+    forecast = stock_forecast(MEDICATIONS, _index(TODAY - timedelta(days=60)), TODAY)
+    assert list(forecast['days_to_threshold']) == [20.0, 0.0]
+    assert list(forecast['stock']) == [30, 5]
@@ -0,0 +1,49 @@
+import json
+
+from medtracker.perf import Recorder
+
+
+def test_run_collects_its_spans_and_counters(tmp_path):
+    recorder = Recorder(enabled=True, export_path=str(tmp_path / 'perf.jsonl'))
+    recorder.start_run('abc')
+    with recorder.span('page.Dashboard'):
+        recorder.count('dose_rows_scanned_total', 5)
+    recorder.finish_run()
+    [run] = recorder.runs
+    assert run['session'] == 'abc'
+    assert [span['name'] for span in run['spans']] == ['page.Dashboard']
+    assert run['counters'] == {'reruns_total': 1, 'dose_rows_scanned_total': 5}
+    with open(tmp_path / 'perf.jsonl') as f:
+        assert json.loads(f.readline())['session'] == 'abc'
+
+
+def test_span_is_recorded_when_the_block_raises():
+    recorder = Recorder(enabled=True, export_path=None)
+    recorder.start_run('abc')
+    try:
+        with recorder.span('page.Dashboard'):
+            raise RuntimeError('stopped')
+    except RuntimeError:
+        pass
+    finally:
+        recorder.finish_run()
+    assert recorder.spans['page.Dashboard'].count == 1
+    assert len(recorder.runs) == 1
+
+
+def test_prometheus_text():
+    recorder = Recorder(enabled=True, export_path=None)
+    with recorder.span('bootstrap'):
+        recorder.count('reruns_total')
+    text = recorder.prometheus_text()
+    assert 'medtracker_span_seconds_count{span="bootstrap"} 1' in text
+    assert 'medtracker_reruns_total 1' in text
+
+
+def test_disabled_recorder_keeps_nothing():
+    recorder = Recorder(enabled=False, export_path=None)
+    recorder.start_run('abc')
+    with recorder.span('bootstrap'):
+        recorder.count('reruns_total')
+    recorder.finish_run()
+    assert not recorder.spans and not recorder.counters and not recorder.runs
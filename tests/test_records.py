@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import numpy as np
+
+from medtracker.records import NO_TIME, DoseRecords, epoch_seconds
+
+DOSES = [
+    {'medication': 'Isoniazid (INH)', 'date': '2024-03-01', 'status': 'Taken', 'notes': 'with food',
+     'taken_at': 1709280000, 'scheduled_at': 1709279100, 'patient_id': 0},
+    {'medication': 'Rifampin (RIF)', 'date': '2024-03-01', 'status': 'Missed', 'notes': '',
+     'taken_at': None, 'scheduled_at': None, 'patient_id': 7},
+    {'medication': 'Isoniazid (INH)', 'date': '2024-03-02', 'status': 'Delayed', 'notes': '',
+     'taken_at': 1709370000, 'scheduled_at': None, 'patient_id': 0},
+]
+
+
+def test_round_trips_dose_dicts():
+    records = DoseRecords(DOSES)
+    assert len(records) == 3
+    assert list(records) == DOSES
+    assert records[-1] == DOSES[-1]
+    assert records.medications == ['Isoniazid (INH)', 'Rifampin (RIF)']
+
+
+def test_extend_with_records_remaps_medication_codes():
+    records = DoseRecords(DOSES[1:2])
+    records.extend(DoseRecords(DOSES))
+    assert list(records) == DOSES[1:2] + DOSES
+
+
+def test_counts_and_select():
+    records = DoseRecords(DOSES + DOSES[:1])
+    assert records.counts() == {
+        ('2024-03-01', 'Isoniazid (INH)', 'Taken'): 2,
+        ('2024-03-01', 'Rifampin (RIF)', 'Missed'): 1,
+        ('2024-03-02', 'Isoniazid (INH)', 'Delayed'): 1,
+    }
+    selected = records.select(records.patient_ids == 7)
+    assert list(selected) == DOSES[1:2]
+
+
+def test_medication_codes_widen_past_int8():
+    records = DoseRecords({'medication': f'Drug {n}', 'date': '2024-03-01', 'status': 'Taken'} for n in range(300))
+    assert records[299]['medication'] == 'Drug 299'
+    assert records.medication_codes.dtype.itemsize >= 2
+
+
+def test_to_frame():
+    frame = DoseRecords(DOSES).to_frame()
+    assert list(frame['medication']) == [dose['medication'] for dose in DOSES]
+    assert list(frame['status'].cat.categories) == ['Taken', 'Missed', 'Delayed']
+    assert frame['hour'].iloc[1] == -1
+    assert frame['date'].dtype == np.dtype('datetime64[ns]')
+
+
+def test_epoch_seconds():
+    assert epoch_seconds(None) == NO_TIME
+    assert epoch_seconds(1709280000) == 1709280000
+    when = datetime(2024, 3, 1, 8, 30)
+    assert epoch_seconds(when) == int(when.timestamp())
@@ -0,0 +1,74 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from medtracker.records import STATUSES
+from medtracker.store import DoseStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DoseStore(str(tmp_path / 'doses.sqlite3'))
+    yield store
+    store.close()
+
+
+def _dose(day, status='Taken', medication='Isoniazid (INH)', patient_id=0):
+    return {'medication': medication, 'date': day, 'status': status, 'patient_id': patient_id}
+
+
+def test_scan_filters_and_orders_by_date(store):
+    store.append_many([_dose('2024-03-03'), _dose('2024-03-01', 'Missed'),
+                       _dose('2024-03-02', medication='Rifampin (RIF)', patient_id=4)])
+    assert [dose['date'] for dose in store.scan()] == ['2024-03-01', '2024-03-02', '2024-03-03']
+    assert len(store.scan((date(2024, 3, 2), None))) == 2
+    assert len(store.scan(medication='Rifampin (RIF)')) == 1
+    assert len(store.scan(patient=0)) == 2
+    assert store.count_by_status() == {'Taken': 2, 'Missed': 1, 'Delayed': 0}
+    assert store.patient_range() == (0, 4)
+
+
+def test_log_is_append_only(store):
+    store.append_dose('Isoniazid (INH)', date(2024, 3, 1), 'Taken')
+    for statement in ('UPDATE doses SET status = "Missed"', 'DELETE FROM doses'):
+        with pytest.raises(sqlite3.DatabaseError, match='append-only'):
+            store._conn.execute(statement)
+    assert len(store) == 1
+
+
+def test_unknown_status_writes_nothing(store):
+    with pytest.raises(ValueError):
+        store.append_many([_dose('2024-03-01'), _dose('2024-03-01', 'Skipped')])
+    assert len(store) == 0
+    assert store.version == 0
+
+
+def test_listeners_see_committed_batches(store):
+    store.append_dose('Isoniazid (INH)', date(2024, 3, 1), 'Taken')
+    batches = []
+    store.subscribe(lambda doses: batches.append(len(doses)), replay=True)
+    store.append_many([_dose('2024-03-02'), _dose('2024-03-03')])
+    assert batches == [1, 2]
+    assert store.version == 2
+
+
+def test_iter_batches(store):
+    store.append_many([_dose(f'2024-03-{day:02d}', STATUSES[day % 3]) for day in range(1, 11)])
+    batches = list(store.iter_batches(4))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert [dose['date'] for batch in batches for dose in batch] == [dose['date'] for dose in store.scan()]
+
+
+def test_migrates_logs_without_the_newer_columns(tmp_path):
+    path = str(tmp_path / 'old.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE doses (id INTEGER PRIMARY KEY, date TEXT NOT NULL, medication TEXT NOT NULL, '
+                 "status TEXT NOT NULL, notes TEXT NOT NULL DEFAULT '')")
+    conn.execute("INSERT INTO doses (date, medication, status) VALUES ('2024-03-01', 'Isoniazid (INH)', 'Taken')")
+    conn.commit()
+    conn.close()
+    store = DoseStore(path)
+    [dose] = store.scan()
+    assert dose['taken_at'] is None and dose['patient_id'] == 0
+    store.close()
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from medtracker.records import STATUSES
+from medtracker.timeindex import DayIndex
+
+FIRST = date(2024, 3, 1)
+
+
+def _doses():
+    doses = []
+    for n in range(30):
+        day = FIRST + timedelta(days=n)
+        doses.append({'medication': 'Isoniazid (INH)', 'date': day, 'status': STATUSES[n % 3]})
+        if n % 2:
+            doses.append({'medication': 'Rifampin (RIF)', 'date': day, 'status': 'Taken'})
+    return doses
+
+
+def _expected(doses, start, end, medication=None):
+    counts = np.zeros(len(STATUSES), dtype=np.int64)
+    for dose in doses:
+        if start <= dose['date'] <= end and medication in (None, dose['medication']):
+            counts[STATUSES.index(dose['status'])] += 1
+    return counts
+
+
+def test_counts_match_a_scan():
+    doses = _doses()
+    index = DayIndex(doses)
+    for start, end in ((FIRST, FIRST + timedelta(days=29)), (FIRST + timedelta(days=5), FIRST + timedelta(days=12)),
+                       (FIRST - timedelta(days=3), FIRST + timedelta(days=2))):
+        assert list(index.counts(start, end)) == list(_expected(doses, start, end))
+        assert list(index.counts(start, end, 'Rifampin (RIF)')) == list(_expected(doses, start, end, 'Rifampin (RIF)'))
+
+
+def test_incremental_apply_matches_a_rebuild():
+    doses = _doses()
+    index = DayIndex(doses[:10])
+    index.apply(doses[10:])
+    # A dose before the current origin shifts the whole index
+    early = {'medication': 'Ethambutol (EMB)', 'date': FIRST - timedelta(days=40), 'status': 'Missed'}
+    index.apply([early])
+    start, end = FIRST - timedelta(days=60), FIRST + timedelta(days=60)
+    assert list(index.counts(start, end)) == list(_expected(doses + [early], start, end))
+    assert index.first_day == early['date']
+
+
+def test_ranges_outside_the_log_are_empty():
+    index = DayIndex(_doses())
+    names = ['Isoniazid (INH)', 'Rifampin (RIF)', 'Pyrazinamide (PZA)']
+    after = (index.last_day + timedelta(days=20), index.last_day + timedelta(days=33))
+    before = (FIRST - timedelta(days=400), FIRST - timedelta(days=300))
+    for start, end in (after, before):
+        assert index.counts(start, end).sum() == 0
+        assert index.adherence(start, end) is None
+        assert index.medication_counts(start, end, names).sum() == 0
+        assert index.by_medication(start, end).empty
+        assert index.daily(start, end).empty
+        assert index.rolling(start, end, 7).isna().all()
+
+
+def test_empty_index():
+    index = DayIndex()
+    assert index.counts(FIRST, FIRST).sum() == 0
+    assert index.medication_counts(FIRST, FIRST, ['Isoniazid (INH)']).shape == (1, len(STATUSES))
@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+from medtracker.store import DoseStore
+from medtracker.transfer import export_doses, file_format, import_doses
+
+CSV = """date,medication,status,notes,taken_at
+2024-03-01,Isoniazid (INH),Taken,with food,2024-03-01T08:00:00+00:00
+2024-03-01,Rifampin (RIF),Missed,,
+2024-03-02,Isoniazid (INH),Skipped,,
+not a date,Isoniazid (INH),Taken,,
+2024-03-02,Aspirin,Taken,,
+2024-03-03,Isoniazid (INH),Delayed,,1709452800
+"""
+KNOWN = ['Isoniazid (INH)', 'Rifampin (RIF)']
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DoseStore(str(tmp_path / 'doses.sqlite3'))
+    yield store
+    store.close()
+
+
+def test_import_skips_and_reports_invalid_rows(store):
+    report = import_doses(io.BytesIO(CSV.encode()), store, 'csv', medications=KNOWN, chunk_rows=2)
+    assert (report['rows'], report['imported'], report['rejected']) == (6, 3, 3)
+    assert [row for row, _ in report['errors']] == [3, 4, 5]
+    doses = store.scan()
+    assert [dose['status'] for dose in doses] == ['Taken', 'Missed', 'Delayed']
+    assert doses[0]['taken_at'] == 1709280000
+    assert doses[2]['taken_at'] == 1709452800
+
+
+def test_missing_required_column(store):
+    with pytest.raises(ValueError, match='status'):
+        import_doses(io.BytesIO(b'date,medication\n2024-03-01,Isoniazid (INH)\n'), store, 'csv')
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_export_round_trips(store, tmp_path, fmt):
+    import_doses(io.BytesIO(CSV.encode()), store, 'csv', medications=KNOWN)
+    path = str(tmp_path / f'doses.{fmt}')
+    assert export_doses(store, path, fmt, chunk_rows=2) == 3
+    copy = DoseStore(str(tmp_path / 'copy.sqlite3'))
+    report = import_doses(path, copy, file_format(path))
+    assert report['imported'] == 3 and report['rejected'] == 0
+    assert list(copy.scan()) == list(store.scan())
+    copy.close()
+
+
+def test_file_format():
+    assert file_format('log.CSV') == 'csv'
+    assert file_format('log.pq') == 'parquet'
+    with pytest.raises(ValueError):
+        file_format('log.xlsx')
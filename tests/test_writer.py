@@ -0,0 +1,87 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from medtracker.store import DoseStore
+from medtracker.writer import DoseWriter
+
+TODAY = date(2024, 6, 30)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DoseStore(str(tmp_path / 'doses.sqlite3'))
+    yield store
+    store.close()
+
+
+def test_queued_doses_are_written_in_order(store):
+    writer = DoseWriter(store, max_delay=1)
+    tickets = [writer.append_dose('Isoniazid (INH)', TODAY, 'Taken', f'dose {n}') for n in range(10)]
+    assert writer.wait(tickets[-1], timeout=5)
+    assert [dose['notes'] for dose in store.scan()] == [f'dose {n}' for n in range(10)]
+    assert writer.pending == 0
+    writer.close()
+
+
+def test_unknown_status_is_refused_at_once(store):
+    writer = DoseWriter(store)
+    with pytest.raises(ValueError):
+        writer.append_dose('Isoniazid (INH)', TODAY, 'Skipped')
+    writer.close()
+
+
+def _failing_listener(doses):
+    if 'Boom' in doses.medications:
+        raise RuntimeError('listener failed')
+
+
+def test_failed_dose_is_reported_to_its_ticket_only(store):
+    store.subscribe(_failing_listener)
+    writer = DoseWriter(store, max_delay=5)
+    good = writer.append_dose('Isoniazid (INH)', TODAY, 'Taken')
+    # Fails the batch and then its own retry
+    bad = writer.append_dose(None, TODAY, 'Taken')
+    # Committed on retry before the listener failed, so it was saved
+    committed = writer.append_dose('Boom', TODAY, 'Taken')
+    assert writer.wait(good, timeout=5)
+    with pytest.raises(Exception):
+        writer.wait(bad, timeout=5)
+    assert writer.wait(committed, timeout=5)
+    assert sorted(dose['medication'] for dose in store.scan()) == ['Boom', 'Isoniazid (INH)']
+    writer.close()
+
+
+def test_listener_failure_after_a_batch_commits_is_not_retried(store):
+    store.subscribe(_failing_listener)
+    writer = DoseWriter(store, max_delay=5)
+    tickets = [writer.append_dose('Boom', TODAY, 'Taken') for _ in range(3)]
+    assert writer.wait(tickets[-1], timeout=5)
+    assert len(store) == 3
+    writer.close()
+
+
+def test_on_commit_runs_before_wait_returns(store):
+    writer = DoseWriter(store)
+    called = threading.Event()
+
+    def on_commit():
+        time.sleep(0.1)
+        called.set()
+
+    ticket = writer.append_dose('Isoniazid (INH)', TODAY, 'Taken', on_commit=on_commit)
+    assert writer.wait(ticket, timeout=5)
+    assert called.is_set()
+    writer.close()
+
+
+def test_close_flushes_and_refuses_later_doses(store):
+    writer = DoseWriter(store, max_delay=5)
+    for _ in range(5):
+        writer.append_dose('Isoniazid (INH)', TODAY, 'Taken')
+    writer.close()
+    assert len(store) == 5
+    with pytest.raises(RuntimeError):
+        writer.append_dose('Isoniazid (INH)', TODAY, 'Taken')